@@ -2,6 +2,8 @@ import numpy as np
 import trimesh
 from trimeshtools.move import move_to_bound
 
+from lib.utils.boolean import boolean_union, boolean_difference
+
 
 def create_middle_box_mesh() -> trimesh.Trimesh:
     OUTER_WIDTH = 31
@@ -20,29 +22,29 @@ def create_middle_box_mesh() -> trimesh.Trimesh:
     box_mesh = trimesh.creation.box((OUTER_WIDTH, OUTER_HEIGHT, OUTER_THICKNESS))
 
     diff_mesh = trimesh.creation.box((OUTER_WIDTH-THICKNESS, OUTER_HEIGHT-THICKNESS, OUTER_THICKNESS))
-    box_mesh = box_mesh.difference(diff_mesh)
+    box_mesh = boolean_difference(box_mesh, diff_mesh)
 
     support_mesh = trimesh.creation.box((OUTER_WIDTH-SUPPORT_OFFSET, OUTER_HEIGHT-SUPPORT_OFFSET, SUPPORT_THICKNESS))
     support_diff_mesh = trimesh.creation.box((OUTER_WIDTH-SUPPORT_RADIUS, OUTER_HEIGHT-SUPPORT_RADIUS, SUPPORT_THICKNESS*2))
-    support_mesh = support_mesh.difference(support_diff_mesh)
+    support_mesh = boolean_difference(support_mesh, support_diff_mesh)
     move_to_bound(box_mesh, 0, 0, 1)
     move_to_bound(support_mesh, 0, 0, -1)
     support_mesh.apply_translation([0, 0, SUPPORT_THICKNESS_OFFSET])
-    box_mesh = box_mesh.union(support_mesh)
+    box_mesh = boolean_union(box_mesh, support_mesh)
 
     diff_mesh = trimesh.creation.box((SOCKET_WIDTH, SOCKET_WIDTH, SOCKET_HEIGHT))
     move_to_bound(box_mesh, 0, -1, -1)
     move_to_bound(diff_mesh, 0, 0, -1)
-    box_mesh = box_mesh.difference(diff_mesh)
+    box_mesh = boolean_difference(box_mesh, diff_mesh)
 
     move_to_bound(box_mesh, 0, 1, -1)
     move_to_bound(diff_mesh, 0, 1, -1)
     diff_mesh.apply_translation([SOCKET_LEFT_OFFSET, 0, 0])
-    box_mesh = box_mesh.difference(diff_mesh)
+    box_mesh = boolean_difference(box_mesh, diff_mesh)
 
     move_to_bound(diff_mesh, 0, 1, -1)
     diff_mesh.apply_translation([SOCKET_RIGHT_OFFSET, 0, 0])
-    box_mesh = box_mesh.difference(diff_mesh)
+    box_mesh = boolean_difference(box_mesh, diff_mesh)
 
     final_mesh = box_mesh
 
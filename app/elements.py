@@ -1,11 +1,12 @@
 import math
+from typing import Iterator
 
 import numpy as np
 import trimesh
 from trimeshtools.combine import concatenate_meshes
 from trimeshtools.rotate import create_rotation_matrix_for_z
 
-from lib.base import GridPlacer, PositionSide, Rotation, CachedBuilderManager
+from lib.base import GridPlacer, PositionSide, Rotation, CachedBuilderManager, ParallelBuildManager
 from lib.factories.board import create_board_builder
 from lib.factories.chip import create_chip_builder
 from lib.constants import BOARD_GRID_STEP, COLOR_BLUE, COLOR_ORANGE, COLOR_BLACK, BOARD_CONTACT_PAD_RADIUS, \
@@ -15,14 +16,53 @@ from lib.factories.led import create_led_builder
 from lib.factories.resistor import create_resistor_builder
 from lib.factories.socket import create_socket_builder
 from lib.factories.track import create_track_builder
+from lib.layout import Layout
 from lib.pattern.structs import BoardPattern, Pin, MultiTrack
 
 
 def create_or_mesh() -> trimesh.Trimesh:
-    build_manager = CachedBuilderManager()
+    layout = create_or_layout()
+    meshes = layout.place(create_prebuilt_placer(layout))
 
-    placer = GridPlacer(build_manager, BOARD_GRID_STEP, (0, 0, 0))
+    final_mesh = concatenate_meshes(*meshes)
+    final_mesh.apply_transform(create_rotation_matrix_for_z(math.pi/2))
+
+    # fix_all(final_mesh)
+    return final_mesh
+
+
+def iter_or_meshes() -> Iterator[trimesh.Trimesh]:
+    """
+    Yields the parts of create_or_mesh() one by one, already centred like run_build_mesh() does with the assembly.
+    """
+    layout = create_or_layout()
+    placer = create_prebuilt_placer(layout)
+
+    # The centring offset comes from the layout bounds, so no part has to be kept until the end
+    transform = create_rotation_matrix_for_z(math.pi/2)
+    corners = trimesh.transform_points(trimesh.bounds.corners(layout.get_bounds(placer)), transform)
+    transform[:2, 3] -= (corners.min(axis=0) + corners.max(axis=0))[:2]/2
+
+    for mesh in layout.place_iter(placer):
+        yield mesh.apply_transform(transform)
+
+
+def create_or_scene() -> trimesh.Scene:
+    layout = create_or_layout()
+    scene = layout.place_scene(create_prebuilt_placer(layout))
+    scene.apply_transform(create_rotation_matrix_for_z(math.pi/2))
 
+    return scene
+
+
+def create_prebuilt_placer(layout: Layout) -> GridPlacer:
+    # Unique parts are built in parallel up front, placements then only read the caches
+    build_manager = ParallelBuildManager(CachedBuilderManager(cache_orientations=True))
+    build_manager.prebuild(layout.builders)
+    return GridPlacer(build_manager, BOARD_GRID_STEP, (0, 0, 0))
+
+
+def create_or_layout() -> Layout:
     board_builder = create_board_builder(14, 9, x_indent=1.2, y_indent=1.2)
     resistor_220om_builder = create_resistor_builder('220 Om', np.array([0, 0, 100, 255]))
     resistor_10kom_builder = create_resistor_builder('10 kOm', np.array([0, 0, 0, 255]))
@@ -42,57 +82,53 @@ def create_or_mesh() -> trimesh.Trimesh:
     jumper_builder_orange_6x1 = create_jumper_builder(6, 1, offset_z=1, color=COLOR_ORANGE)
     jumper_builder_blue_6x1 = create_jumper_builder(6, 1, offset_z=1, color=COLOR_BLUE)
 
-    meshes = []
-    meshes.append(placer.place(board_builder, (0, 0), PositionSide.TOP, Rotation.NO_ROTATION))
-
-    meshes.append(placer.place(resistor_10kom_builder, (2, 5), PositionSide.TOP, Rotation.NO_ROTATION))
-    meshes.append(placer.place(resistor_10kom_builder, (2, 6), PositionSide.TOP, Rotation.NO_ROTATION))
-    meshes.append(placer.place(resistor_10kom_builder, (2, 7), PositionSide.TOP, Rotation.NO_ROTATION))
-    meshes.append(placer.place(resistor_220om_builder, (3, 8), PositionSide.TOP, Rotation.NO_ROTATION))
-    meshes.append(placer.place(resistor_220om_builder, (3, 0), PositionSide.TOP, Rotation.ROTATE_COUNTER_CLOCKWISE_90))
-    meshes.append(placer.place(resistor_220om_builder, (9, 0), PositionSide.TOP, Rotation.NO_ROTATION))
-
-    meshes.append(placer.place(orange_led_builder, (2, 0), PositionSide.TOP, Rotation.ROTATE_180))
-    meshes.append(placer.place(orange_led_builder, (2, 8), PositionSide.TOP, Rotation.ROTATE_180))
-    meshes.append(placer.place(blue_led_builder, (13, 2), PositionSide.TOP, Rotation.ROTATE_CLOCKWISE_90))
-
-    meshes.append(placer.place(chip_builder, (7, 1), PositionSide.TOP, Rotation.ROTATE_COUNTER_CLOCKWISE_90))
-
-    meshes.append(placer.place(socket_builder, (-2, 0), PositionSide.TOP, Rotation.ROTATE_180))
-    meshes.append(placer.place(socket_builder, (-2, 6), PositionSide.TOP, Rotation.ROTATE_180))
-    meshes.append(placer.place(socket_builder, (11, 3), PositionSide.TOP, Rotation.NO_ROTATION))
-
-    meshes.append(placer.place(track_builder_1x4, (2, 5), PositionSide.BOTTOM, Rotation.NO_ROTATION))
-    meshes.append(placer.place(track_builder_1x3, (1, 0), PositionSide.BOTTOM, Rotation.NO_ROTATION))
-    meshes.append(placer.place(track_builder_1x3, (1, 2), PositionSide.BOTTOM, Rotation.ROTATE_CLOCKWISE_90))
-    meshes.append(placer.place(track_builder_2x1, (0, 1), PositionSide.BOTTOM, Rotation.NO_ROTATION))
-    meshes.append(placer.place(track_builder_2x1, (1, 6), PositionSide.BOTTOM, Rotation.ROTATE_CLOCKWISE_90))
-    meshes.append(placer.place(track_builder_2x1, (0, 7), PositionSide.BOTTOM, Rotation.NO_ROTATION))
-    meshes.append(placer.place(track_builder_1x5, (3, 2), PositionSide.BOTTOM, Rotation.NO_ROTATION))
-    meshes.append(placer.place(track_builder_2x1, (12, 5), PositionSide.BOTTOM, Rotation.NO_ROTATION))
-    meshes.append(placer.place(track_builder_1x3, (13, 3), PositionSide.BOTTOM, Rotation.NO_ROTATION))
-    meshes.append(placer.place(track_builder_1x3, (13, 0), PositionSide.BOTTOM, Rotation.NO_ROTATION))
-    meshes.append(placer.place(track_builder_1x1, (3, 0), PositionSide.BOTTOM, Rotation.NO_ROTATION))
-    meshes.append(placer.place(track_builder_1x1, (3, 8), PositionSide.BOTTOM, Rotation.NO_ROTATION))
-    meshes.append(placer.place(track_builder_2x1, (6, 5), PositionSide.BOTTOM, Rotation.NO_ROTATION))
-    meshes.append(placer.place(track_builder_1x5, (3, 6), PositionSide.BOTTOM, Rotation.ROTATE_CLOCKWISE_90))
-    meshes.append(placer.place(track_builder_2x1, (6, 7), PositionSide.BOTTOM, Rotation.NO_ROTATION))
-    meshes.append(placer.place(track_builder_2x1, (7, 7), PositionSide.BOTTOM, Rotation.ROTATE_CLOCKWISE_90))
-    meshes.append(placer.place(track_builder_1x1, (7, 1), PositionSide.BOTTOM, Rotation.NO_ROTATION))
-    meshes.append(placer.place(track_builder_1x1, (10, 7), PositionSide.BOTTOM, Rotation.NO_ROTATION))
-    meshes.append(placer.place(track_builder_1x8, (2, 1), PositionSide.BOTTOM, Rotation.ROTATE_CLOCKWISE_90))
-    meshes.append(placer.place(track_builder_2x1, (2, 0), PositionSide.BOTTOM, Rotation.ROTATE_CLOCKWISE_90))
-    meshes.append(placer.place(track_builder_2x1, (9, 0), PositionSide.BOTTOM, Rotation.ROTATE_CLOCKWISE_90))
-
-    meshes.append(placer.place(jumper_builder_black_1x5, (2, 1), PositionSide.BOTTOM, Rotation.NO_ROTATION))
-    meshes.append(placer.place(jumper_builder_orange_6x1, (1, 7), PositionSide.BOTTOM, Rotation.NO_ROTATION))
-    meshes.append(placer.place(jumper_builder_blue_6x1, (7, 5), PositionSide.BOTTOM, Rotation.NO_ROTATION))
-
-    final_mesh = concatenate_meshes(*meshes)
-    final_mesh.apply_transform(create_rotation_matrix_for_z(math.pi/2))
-
-    # fix_all(final_mesh)
-    return final_mesh
+    layout = Layout()
+    layout.add(board_builder, (0, 0), PositionSide.TOP, Rotation.NO_ROTATION)
+
+    layout.add(resistor_10kom_builder, (2, 5), PositionSide.TOP, Rotation.NO_ROTATION)
+    layout.add(resistor_10kom_builder, (2, 6), PositionSide.TOP, Rotation.NO_ROTATION)
+    layout.add(resistor_10kom_builder, (2, 7), PositionSide.TOP, Rotation.NO_ROTATION)
+    layout.add(resistor_220om_builder, (3, 8), PositionSide.TOP, Rotation.NO_ROTATION)
+    layout.add(resistor_220om_builder, (3, 0), PositionSide.TOP, Rotation.ROTATE_COUNTER_CLOCKWISE_90)
+    layout.add(resistor_220om_builder, (9, 0), PositionSide.TOP, Rotation.NO_ROTATION)
+
+    layout.add(orange_led_builder, (2, 0), PositionSide.TOP, Rotation.ROTATE_180)
+    layout.add(orange_led_builder, (2, 8), PositionSide.TOP, Rotation.ROTATE_180)
+    layout.add(blue_led_builder, (13, 2), PositionSide.TOP, Rotation.ROTATE_CLOCKWISE_90)
+
+    layout.add(chip_builder, (7, 1), PositionSide.TOP, Rotation.ROTATE_COUNTER_CLOCKWISE_90)
+
+    layout.add(socket_builder, (-2, 0), PositionSide.TOP, Rotation.ROTATE_180)
+    layout.add(socket_builder, (-2, 6), PositionSide.TOP, Rotation.ROTATE_180)
+    layout.add(socket_builder, (11, 3), PositionSide.TOP, Rotation.NO_ROTATION)
+
+    layout.add(track_builder_1x4, (2, 5), PositionSide.BOTTOM, Rotation.NO_ROTATION)
+    layout.add(track_builder_1x3, (1, 0), PositionSide.BOTTOM, Rotation.NO_ROTATION)
+    layout.add(track_builder_1x3, (1, 2), PositionSide.BOTTOM, Rotation.ROTATE_CLOCKWISE_90)
+    layout.add(track_builder_2x1, (0, 1), PositionSide.BOTTOM, Rotation.NO_ROTATION)
+    layout.add(track_builder_2x1, (1, 6), PositionSide.BOTTOM, Rotation.ROTATE_CLOCKWISE_90)
+    layout.add(track_builder_2x1, (0, 7), PositionSide.BOTTOM, Rotation.NO_ROTATION)
+    layout.add(track_builder_1x5, (3, 2), PositionSide.BOTTOM, Rotation.NO_ROTATION)
+    layout.add(track_builder_2x1, (12, 5), PositionSide.BOTTOM, Rotation.NO_ROTATION)
+    layout.add(track_builder_1x3, (13, 3), PositionSide.BOTTOM, Rotation.NO_ROTATION)
+    layout.add(track_builder_1x3, (13, 0), PositionSide.BOTTOM, Rotation.NO_ROTATION)
+    layout.add(track_builder_1x1, (3, 0), PositionSide.BOTTOM, Rotation.NO_ROTATION)
+    layout.add(track_builder_1x1, (3, 8), PositionSide.BOTTOM, Rotation.NO_ROTATION)
+    layout.add(track_builder_2x1, (6, 5), PositionSide.BOTTOM, Rotation.NO_ROTATION)
+    layout.add(track_builder_1x5, (3, 6), PositionSide.BOTTOM, Rotation.ROTATE_CLOCKWISE_90)
+    layout.add(track_builder_2x1, (6, 7), PositionSide.BOTTOM, Rotation.NO_ROTATION)
+    layout.add(track_builder_2x1, (7, 7), PositionSide.BOTTOM, Rotation.ROTATE_CLOCKWISE_90)
+    layout.add(track_builder_1x1, (7, 1), PositionSide.BOTTOM, Rotation.NO_ROTATION)
+    layout.add(track_builder_1x1, (10, 7), PositionSide.BOTTOM, Rotation.NO_ROTATION)
+    layout.add(track_builder_1x8, (2, 1), PositionSide.BOTTOM, Rotation.ROTATE_CLOCKWISE_90)
+    layout.add(track_builder_2x1, (2, 0), PositionSide.BOTTOM, Rotation.ROTATE_CLOCKWISE_90)
+    layout.add(track_builder_2x1, (9, 0), PositionSide.BOTTOM, Rotation.ROTATE_CLOCKWISE_90)
+
+    layout.add(jumper_builder_black_1x5, (2, 1), PositionSide.BOTTOM, Rotation.NO_ROTATION)
+    layout.add(jumper_builder_orange_6x1, (1, 7), PositionSide.BOTTOM, Rotation.NO_ROTATION)
+    layout.add(jumper_builder_blue_6x1, (7, 5), PositionSide.BOTTOM, Rotation.NO_ROTATION)
+
+    return layout
 
 
 def create_or_board_pattern() -> BoardPattern:
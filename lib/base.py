@@ -1,14 +1,19 @@
 import abc
+import hashlib
 import math
 import os
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
-from typing import Tuple, Dict
+from itertools import repeat
+from typing import Tuple, Any, Optional, Dict, Iterable, List, Sequence
 
+import numpy as np
 import trimesh
-from trimeshtools.move import move_to_bound
 from trimeshtools.rotate import create_rotation_matrix_for_x, create_rotation_matrix_for_z
 
-from lib.constants import CACHE_DIR
+from lib.constants import CACHE_DIR, CACHE_MAX_BYTES
+from lib.utils.cache import MeshCache
+from lib.utils.storage import MESH_FILE_EXTENSION, save_mesh, load_mesh
 
 FloatPosition3d = Tuple[float, float, float]
 IntPosition3d = Tuple[int, int, int]
@@ -44,26 +49,90 @@ class Rotation(Enum):
 
 
 class BaseMeshBuilder(abc.ABC):
+    # Bump in a subclass whenever its build() output changes to invalidate cached meshes
+    CACHE_VERSION: int = 1
+    # Whether build managers may keep oriented copies of the part (up to 8 per builder) in memory
+    CACHE_ORIENTATIONS: bool = True
+
     @abc.abstractmethod
     def build(self) -> trimesh.Trimesh:
         raise NotImplementedError()
 
     @property
     def cache_key(self) -> str:
-        return '_'.join([
-            self.__class__.__name__,
-            *[str(getattr(self, attr)) for attr in self.__dict__.keys()],
-        ])
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(_serialize_cache_value(self.__class__).encode())
+        digest.update(_serialize_cache_value(self.CACHE_VERSION).encode())
+        digest.update(_serialize_cache_value(self.__dict__).encode())
+        return f'{self.__class__.__name__}_{digest.hexdigest()}'
 
     def get_offset(self, side: PositionSide, rotation: Rotation) -> FloatPosition3d:
         return 0, 0, 0
 
 
+def _serialize_cache_value(value: Any) -> str:
+    # Canonical, type-tagged and exact representation of builder parameters:
+    # equal values of different types (1, True, 1.0, an IntEnum member) never share a key
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, Enum):
+        return f'{_serialize_cache_value(value.__class__)}.{value.name}'
+    if isinstance(value, type):
+        return f'{value.__module__}.{value.__qualname__}'
+    if value is None or isinstance(value, (bool, str)):
+        return f'{type(value).__qualname__}:{value!r}'
+    if isinstance(value, int):
+        return f'{type(value).__qualname__}:{int(value)}'
+    if isinstance(value, float):
+        return f'{type(value).__qualname__}:{float(value).hex()}'
+    if isinstance(value, np.ndarray):
+        data_digest = hashlib.blake2b(np.ascontiguousarray(value).tobytes(), digest_size=16).hexdigest()
+        return f'ndarray:{value.dtype.str}{value.shape}{data_digest}'
+    if isinstance(value, (list, tuple)):
+        return f'{type(value).__qualname__}[' + ','.join(_serialize_cache_value(item) for item in value) + ']'
+    if isinstance(value, dict):
+        items = sorted((_serialize_cache_value(key), _serialize_cache_value(item)) for key, item in value.items())
+        return f'{type(value).__qualname__}{{' + ','.join(f'{key}:{item}' for key, item in items) + '}'
+    if hasattr(value, '__dict__'):
+        return f'{_serialize_cache_value(value.__class__)}{_serialize_cache_value(vars(value))}'
+    raise TypeError(f"Cannot build cache key for value of type {type(value).__name__}")
+
+
+def create_orientation_matrix(mesh_builder: BaseMeshBuilder, bounds: np.ndarray, side: PositionSide, rotation: Rotation) -> np.ndarray:
+    # Rotates the part, flips it to the given side, aligns it to the bounds and applies the builder offset
+    matrix = np.eye(4)
+
+    if rotation != rotation.NO_ROTATION:
+        matrix = create_rotation_matrix_for_z(-rotation.angle) @ matrix
+
+    if side == PositionSide.BOTTOM:
+        matrix = create_rotation_matrix_for_x(math.pi) @ matrix
+
+    # Rotations are multiples of 90 degrees, so the rotated bounding box corners give exact new bounds
+    rotated_corners = trimesh.transform_points(trimesh.bounds.corners(bounds), matrix)
+    rotated_min = rotated_corners.min(axis=0)
+    rotated_max = rotated_corners.max(axis=0)
+    bound_z = rotated_min[2] if side == PositionSide.TOP else rotated_max[2]
+
+    mesh_offset = mesh_builder.get_offset(side, rotation)
+    matrix[:3, 3] += [
+        mesh_offset[0] - rotated_min[0],
+        mesh_offset[1] - rotated_min[1],
+        side.direction*mesh_offset[2] - bound_z,
+    ]
+
+    return matrix
+
+
 class BaseBuildManager(abc.ABC):
     @abc.abstractmethod
     def build(self, builder: BaseMeshBuilder) -> trimesh.Trimesh:
         raise NotImplementedError()
 
+    def build_oriented(self, builder: BaseMeshBuilder, side: PositionSide, rotation: Rotation) -> trimesh.Trimesh:
+        mesh = self.build(builder)
+        return mesh.apply_transform(create_orientation_matrix(builder, mesh.bounds, side, rotation))
+
 
 class TransparentBuildManager(BaseBuildManager):
     def build(self, builder: BaseMeshBuilder) -> trimesh.Trimesh:
@@ -71,30 +140,175 @@ class TransparentBuildManager(BaseBuildManager):
 
 
 class CachedBuilderManager(BaseBuildManager):
-    _MAP: Dict[str, trimesh.Trimesh] = {}
+    _memory_cache: MeshCache
     _dir_path: str
-    
-    def __init__(self, dir_path: str = CACHE_DIR):
+    _mmap: bool
+    _cache_orientations: bool
+
+    def __init__(
+        self,
+        dir_path: str = CACHE_DIR,
+        mmap: bool = False,
+        memory_cache: Optional[MeshCache] = None,
+        cache_orientations: bool = False,
+    ):
+        """
+        With mmap=True cached meshes are memory-mapped from disk and shared read-only between
+        all returned meshes: vertices are only copied when a returned mesh is transformed.
+
+        Built meshes are kept in a bounded LRU memory_cache. By default every manager gets its own one,
+        pass the same MeshCache to several managers to share it.
+
+        With cache_orientations=True every oriented variant returned by build_oriented() is kept
+        in the same memory cache, unless the builder disables it with CACHE_ORIENTATIONS.
+        """
+        self._memory_cache = memory_cache if memory_cache is not None else MeshCache(CACHE_MAX_BYTES)
         self._dir_path = dir_path
+        self._mmap = mmap
+        self._cache_orientations = cache_orientations
         if not os.path.exists(dir_path):
             os.makedirs(dir_path, exist_ok=True)
-    
+
+    @property
+    def memory_cache(self) -> MeshCache:
+        return self._memory_cache
+
+    @property
+    def dir_path(self) -> str:
+        return self._dir_path
+
+    def is_cached(self, builder: BaseMeshBuilder) -> bool:
+        cache_key = builder.cache_key
+        return cache_key in self._memory_cache or os.path.exists(self._get_file_path(cache_key))
+
     def build(self, builder: BaseMeshBuilder) -> trimesh.Trimesh:
-        if builder.cache_key in CachedBuilderManager._MAP:
-            return CachedBuilderManager._MAP[builder.cache_key].copy()
+        cache_key = builder.cache_key
+
+        mesh = self._memory_cache.get(cache_key)
+        if mesh is not None:
+            return self._copy(mesh)
 
-        file_path = os.path.join(self._dir_path, f'{builder.cache_key}.obj')
+        file_path = self._get_file_path(cache_key)
         if os.path.exists(file_path):
-            mesh = trimesh.load(file_path)
-            assert isinstance(mesh, trimesh.Trimesh)
-            CachedBuilderManager._MAP[builder.cache_key] = mesh
-            return mesh.copy()
+            mesh = load_mesh(file_path, mmap=self._mmap)
+            self._memory_cache.put(cache_key, mesh)
+            return self._copy(mesh)
 
         mesh = builder.build()
-        mesh.export(file_path)
-        CachedBuilderManager._MAP[builder.cache_key] = mesh
+        save_mesh(mesh, file_path)
+        if self._mmap:
+            mesh = load_mesh(file_path, mmap=True)
+        self._memory_cache.put(cache_key, mesh)
+        return self._copy(mesh)
+
+    def build_oriented(self, builder: BaseMeshBuilder, side: PositionSide, rotation: Rotation) -> trimesh.Trimesh:
+        if not self._cache_orientations or not builder.CACHE_ORIENTATIONS:
+            return super().build_oriented(builder, side, rotation)
+
+        cache_key = f'{builder.cache_key}_{side.name}_{rotation.name}'
+
+        mesh = self._memory_cache.get(cache_key)
+        if mesh is None:
+            mesh = super().build_oriented(builder, side, rotation)
+            self._memory_cache.put(cache_key, mesh)
+
+        return self._copy(mesh)
+
+    def _get_file_path(self, cache_key: str) -> str:
+        return os.path.join(self._dir_path, f'{cache_key}.{MESH_FILE_EXTENSION}')
+
+    def _copy(self, mesh: trimesh.Trimesh) -> trimesh.Trimesh:
+        if not self._mmap:
+            return mesh.copy()
+
+        # Copy-on-transform: share read-only buffers, trimesh allocates new ones on every transform
+        return trimesh.Trimesh(
+            vertices=_readonly_view(mesh.vertices),
+            faces=_readonly_view(mesh.faces),
+            face_colors=_readonly_view(mesh.visual.face_colors),
+            process=False,
+        )
+
+
+class ParallelBuildManager(BaseBuildManager):
+    """
+    Builds independent parts in a process pool.
+
+    Call prebuild() with every builder of a layout before placing it: unique builders are built
+    concurrently in worker processes. Workers only get the builders and the cache directory, never the manager:
+    with a CachedBuilderManager they fill its disk cache and build()/build_oriented() are then delegated to it,
+    so its mmap and orientation caching still apply. With any other build_manager the prebuilt meshes
+    are built by builder.build() and kept in a bounded LRU memory_cache.
+    Builders that were not prebuilt are delegated to build_manager in the current process.
+    """
+    _build_manager: BaseBuildManager
+    _max_workers: Optional[int]
+    _memory_cache: MeshCache
+
+    def __init__(self, build_manager: Optional[BaseBuildManager] = None, max_workers: Optional[int] = None, memory_cache: Optional[MeshCache] = None):
+        self._build_manager = build_manager if build_manager is not None else TransparentBuildManager()
+        self._max_workers = max_workers
+        self._memory_cache = memory_cache if memory_cache is not None else MeshCache(CACHE_MAX_BYTES)
+
+    @property
+    def memory_cache(self) -> MeshCache:
+        return self._memory_cache
+
+    def prebuild(self, builders: Iterable[BaseMeshBuilder]) -> None:
+        pending = {}
+        for builder in builders:
+            if not self._is_prebuilt(builder):
+                pending[builder.cache_key] = builder
+
+        if len(pending) == 0:
+            return
+
+        if len(pending) == 1 or self._max_workers == 1:
+            for cache_key, builder in pending.items():
+                mesh = self._build_manager.build(builder)
+                if not isinstance(self._build_manager, CachedBuilderManager):
+                    self._memory_cache.put(cache_key, mesh)
+            return
+
+        with ProcessPoolExecutor(max_workers=self._max_workers) as executor:
+            if isinstance(self._build_manager, CachedBuilderManager):
+                # Meshes stay in the disk cache, the wrapped manager loads them on demand
+                list(executor.map(_build_to_disk_cache, repeat(self._build_manager.dir_path), pending.values()))
+            else:
+                for cache_key, mesh in zip(pending.keys(), executor.map(_build_mesh, pending.values())):
+                    self._memory_cache.put(cache_key, mesh)
+
+    def build(self, builder: BaseMeshBuilder) -> trimesh.Trimesh:
+        mesh = self._memory_cache.get(builder.cache_key)
+        if mesh is None:
+            return self._build_manager.build(builder)
         return mesh.copy()
 
+    def build_oriented(self, builder: BaseMeshBuilder, side: PositionSide, rotation: Rotation) -> trimesh.Trimesh:
+        if builder.cache_key in self._memory_cache:
+            return super().build_oriented(builder, side, rotation)
+        return self._build_manager.build_oriented(builder, side, rotation)
+
+    def _is_prebuilt(self, builder: BaseMeshBuilder) -> bool:
+        if isinstance(self._build_manager, CachedBuilderManager):
+            return self._build_manager.is_cached(builder)
+        return builder.cache_key in self._memory_cache
+
+
+def _build_mesh(builder: BaseMeshBuilder) -> trimesh.Trimesh:
+    return builder.build()
+
+
+def _build_to_disk_cache(dir_path: str, builder: BaseMeshBuilder) -> None:
+    # An empty memory cache: the worker only writes the mesh file and keeps nothing
+    CachedBuilderManager(dir_path, memory_cache=MeshCache(0)).build(builder)
+
+
+def _readonly_view(array: np.ndarray) -> np.ndarray:
+    view = array.view(np.ndarray)
+    view.flags.writeable = False
+    return view
+
 
 class GridPlacer:
     _build_manager: BaseBuildManager
@@ -107,21 +321,55 @@ class GridPlacer:
         self._offset = offset
 
     def place(self, mesh_builder: BaseMeshBuilder, position: IntPosition2d, side: PositionSide, rotation: Rotation) -> trimesh.Trimesh:
-        mesh = self._build_manager.build(mesh_builder)
+        # The oriented part may come from the build manager cache, so only a translation is left
+        mesh = self._build_manager.build_oriented(mesh_builder, side, rotation)
+        return mesh.apply_translation(self._get_position_offset(position))
 
-        if rotation != rotation.NO_ROTATION:
-            mesh.apply_transform(create_rotation_matrix_for_z(-rotation.angle))
+    def place_many(self, mesh_builder: BaseMeshBuilder, placements: Sequence[Tuple[IntPosition2d, PositionSide, Rotation]]) -> List[trimesh.Trimesh]:
+        placed: Dict[int, trimesh.Trimesh] = {}
 
-        if side == PositionSide.BOTTOM:
-            mesh.apply_transform(create_rotation_matrix_for_x(math.pi))
+        orientation_groups: Dict[Tuple[PositionSide, Rotation], List[int]] = {}
+        for i, (_, side, rotation) in enumerate(placements):
+            orientation_groups.setdefault((side, rotation), []).append(i)
 
-        move_to_bound(mesh, 1, 1, side.direction)
+        for (side, rotation), indexes in orientation_groups.items():
+            # The part is oriented once per group, all its copies are translated by a single stacked addition
+            mesh = self._build_manager.build_oriented(mesh_builder, side, rotation)
+            offsets = np.array([self._get_position_offset(placements[i][0]) for i in indexes])
+            vertices = mesh.vertices[np.newaxis, :, :] + offsets[:, np.newaxis, :]
 
-        mesh_offset = mesh_builder.get_offset(side, rotation)
-        offset_x = self._offset[0] + position[0]*self._step + mesh_offset[0]
-        offset_y = self._offset[1] + position[1]*self._step + mesh_offset[1]
-        offset_z = self._offset[2] + side.direction*mesh_offset[2]
+            faces = _readonly_view(mesh.faces)
+            face_colors = _readonly_view(mesh.visual.face_colors)
+            for i, placed_vertices in zip(indexes, vertices):
+                placed[i] = trimesh.Trimesh(vertices=placed_vertices, faces=faces, face_colors=face_colors, process=False)
 
-        mesh.apply_translation([offset_x, offset_y, offset_z])
+        return [placed[i] for i in range(len(placements))]
 
-        return mesh
+    def place_instances(self, mesh_builder: BaseMeshBuilder, placements: Sequence[Tuple[IntPosition2d, PositionSide, Rotation]]) -> Tuple[trimesh.Trimesh, List[np.ndarray]]:
+        # Returns the untransformed part and one 4x4 transform per placement instead of transformed copies
+        mesh = self._build_manager.build(mesh_builder)
+        return mesh, [
+            self.get_transform(mesh_builder, mesh.bounds, position, side, rotation)
+            for position, side, rotation in placements
+        ]
+
+    def get_placed_bounds(self, mesh_builder: BaseMeshBuilder, placements: Sequence[Tuple[IntPosition2d, PositionSide, Rotation]]) -> np.ndarray:
+        # Bounds of all placed copies without placing them: rotations are multiples of 90 degrees, so transformed corners are exact
+        bounds = self._build_manager.build(mesh_builder).bounds
+        corners = np.concatenate([
+            trimesh.transform_points(trimesh.bounds.corners(bounds), self.get_transform(mesh_builder, bounds, position, side, rotation))
+            for position, side, rotation in placements
+        ])
+        return np.array([corners.min(axis=0), corners.max(axis=0)])
+
+    def get_transform(self, mesh_builder: BaseMeshBuilder, bounds: np.ndarray, position: IntPosition2d, side: PositionSide, rotation: Rotation) -> np.ndarray:
+        matrix = create_orientation_matrix(mesh_builder, bounds, side, rotation)
+        matrix[:3, 3] += self._get_position_offset(position)
+        return matrix
+
+    def _get_position_offset(self, position: IntPosition2d) -> np.ndarray:
+        return np.array([
+            self._offset[0] + position[0]*self._step,
+            self._offset[1] + position[1]*self._step,
+            self._offset[2],
+        ])
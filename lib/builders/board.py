@@ -1,13 +1,22 @@
+from typing import Tuple
+
 import numpy as np
+import shapely
 import trimesh
-from trimeshtools.combine import union_meshes, concatenate_meshes
+from trimeshtools.combine import concatenate_meshes
 from trimeshtools.move import move_to_bound
 
 from lib.base import BaseMeshBuilder, FloatPosition3d, Rotation, PositionSide
 from lib.constants import CYLINDER_SECTIONS
+from lib.utils.boolean import boolean_difference
+from lib.utils.mesh import tile_mesh, orient_faces_ccw, union_components
+from lib.utils.primitives import create_cylinder
 
 
 class BoardBuilder(BaseMeshBuilder):
+    # The board is large and usually placed once, oriented copies are not worth the memory
+    CACHE_ORIENTATIONS = False
+
     _x_count: int
     _y_count: int
     _step: float
@@ -50,20 +59,29 @@ class BoardBuilder(BaseMeshBuilder):
         board_mesh = trimesh.creation.box([self._step*self._x_count + self._x_indent*2, self._step*self._y_count + self._y_indent*2, self._thickness-self._contact_pad_thickness*2])
 
         move_to_bound(board_mesh, 1, 1, 0)
-        diff_mesh = trimesh.creation.cylinder(radius=self._pad_radius, height=self._thickness*2, sections=CYLINDER_SECTIONS)
-        union_mesh = trimesh.creation.cylinder(radius=self._contact_pad_radius, height=self._thickness, sections=CYLINDER_SECTIONS)
-        union_mesh = union_mesh.difference(diff_mesh)
+        diff_mesh = create_cylinder(self._pad_radius, self._thickness*2, CYLINDER_SECTIONS)
+        union_mesh = create_cylinder(self._contact_pad_radius, self._thickness, CYLINDER_SECTIONS)
+        union_mesh = boolean_difference(union_mesh, diff_mesh)
 
-        diff_mesh = trimesh.creation.cylinder(radius=(self._pad_radius + self._contact_pad_radius)/2, height=self._thickness*2, sections=CYLINDER_SECTIONS)
+        hole_radius = (self._pad_radius + self._contact_pad_radius)/2
+        diff_mesh = create_cylinder(hole_radius, self._thickness*2, CYLINDER_SECTIONS)
 
+        holes = []
         for i in range(self._x_count):
             for j in range(self._y_count):
-                board_mesh = board_mesh.difference(diff_mesh.copy().apply_translation([
+                holes.append(diff_mesh.copy().apply_translation([
                     self._x_indent + self._step / 2 + i * self._step,
                     self._y_indent + self._step / 2 + j * self._step,
                     0
                 ]))
 
+        # Drill all holes with a single boolean call: disjoint holes are simply
+        # concatenated into one cutter, overlapping ones are unioned by the engine.
+        if hole_radius*2 < self._step:
+            board_mesh = boolean_difference(board_mesh, trimesh.util.concatenate(holes))
+        else:
+            board_mesh = boolean_difference(board_mesh, *holes)
+
         contact_pads = []
         for i in range(self._x_count):
             for j in range(self._y_count):
@@ -72,7 +90,7 @@ class BoardBuilder(BaseMeshBuilder):
                     self._y_indent + self._step / 2 + j * self._step,
                     0
                 ]))
-        contact_pads = union_meshes(*contact_pads)
+        contact_pads = union_components(contact_pads)
 
         board_mesh.visual.face_colors = self._color
         contact_pads.visual.face_colors = self._contact_pad_color
@@ -93,3 +111,151 @@ class BoardBuilder(BaseMeshBuilder):
                 -self._thickness/2
             )
         raise Exception(f"Invalid rotation for {self.__class__.__name__}")  # TODO custom exception
+
+
+class AnalyticBoardBuilder(BoardBuilder):
+    """
+    Builds the same board as BoardBuilder without boolean operations.
+
+    A single grid cell (a square with a hole) is triangulated once and tiled over the grid,
+    with the cell corners indexed directly into a shared grid of nodes. The indents are filled
+    with plain quads on the same nodes, and the resulting 2D triangulation is extruded
+    to the board thickness. Contact pads are tiled copies of one precomputed annulus.
+    """
+
+    def build(self) -> trimesh.Trimesh:
+        hole_radius = (self._pad_radius + self._contact_pad_radius)/2
+
+        # Cells and pads must not touch each other, otherwise fall back to CSG
+        if max(hole_radius, self._contact_pad_radius)*2 >= self._step:
+            return super().build()
+
+        board_mesh = self._create_board_mesh(hole_radius)
+        contact_pads = tile_mesh(
+            trimesh.creation.annulus(r_min=self._pad_radius, r_max=self._contact_pad_radius, height=self._thickness, sections=CYLINDER_SECTIONS),
+            np.column_stack([self._get_cell_centers(), np.zeros(self._x_count*self._y_count)]),
+        )
+
+        board_mesh.visual.face_colors = self._color
+        contact_pads.visual.face_colors = self._contact_pad_color
+
+        return concatenate_meshes(board_mesh, contact_pads)
+
+    def _create_board_mesh(self, hole_radius: float) -> trimesh.Trimesh:
+        half_step = self._step/2
+        cell = shapely.Polygon(
+            [(-half_step, -half_step), (half_step, -half_step), (half_step, half_step), (-half_step, half_step)],
+            [shapely.Point(0, 0).buffer(hole_radius, quad_segs=CYLINDER_SECTIONS//4).exterior.coords],
+        )
+        cell_vertices, cell_faces = trimesh.creation.triangulate_polygon(cell)
+
+        # The triangulation repeats the closing points of the rings, merge them and drop unused vertices
+        unique, inverse = trimesh.grouping.unique_rows(cell_vertices, digits=8)
+        cell_vertices, cell_faces = cell_vertices[unique], inverse[cell_faces]
+        used, cell_faces = np.unique(cell_faces, return_inverse=True)
+        cell_vertices, cell_faces = cell_vertices[used], orient_faces_ccw(cell_vertices[used], cell_faces.reshape(-1, 3))
+
+        # Cell corners and indent edges lie on a regular grid of nodes shared by the neighbouring cells and frame quads
+        xs, x_first = self._get_grid_lines(self._x_count, self._x_indent)
+        ys, y_first = self._get_grid_lines(self._y_count, self._y_indent)
+        grid_i, grid_j = np.meshgrid(np.arange(len(xs)), np.arange(len(ys)), indexing='ij')
+        grid_vertices = np.column_stack([xs[grid_i.ravel()], ys[grid_j.ravel()]])
+
+        is_corner = np.all(np.isclose(np.abs(cell_vertices), half_step), axis=1)
+        assert np.count_nonzero(is_corner) == 4
+        corner_i = (cell_vertices[is_corner, 0] > 0).astype(np.int64)
+        corner_j = (cell_vertices[is_corner, 1] > 0).astype(np.int64)
+
+        cell_i, cell_j = np.meshgrid(np.arange(self._x_count), np.arange(self._y_count), indexing='ij')
+        cell_i, cell_j = cell_i.ravel() + x_first, cell_j.ravel() + y_first
+        cells_count = len(cell_i)
+
+        # Hole vertices belong to a single cell and are tiled, corners are mapped to the grid nodes
+        inner_vertices = cell_vertices[~is_corner]
+        tiled_vertices = (inner_vertices[np.newaxis, :, :] + self._get_cell_centers()[:, np.newaxis, :]).reshape(-1, 2)
+
+        cell_indexes = np.empty((cells_count, len(cell_vertices)), dtype=np.int64)
+        cell_indexes[:, ~is_corner] = len(grid_vertices) + np.arange(cells_count)[:, np.newaxis]*len(inner_vertices) + np.arange(len(inner_vertices))
+        cell_indexes[:, is_corner] = (cell_i[:, np.newaxis] + corner_i)*len(ys) + cell_j[:, np.newaxis] + corner_j
+        faces = cell_indexes[:, cell_faces].reshape(-1, 3)
+
+        # Walls go along the hole rings of every cell and along the outer border of the grid
+        cell_boundary = _get_boundary_edges(cell_faces)
+        hole_boundary = cell_boundary[np.all(~is_corner[cell_boundary], axis=1)]
+        boundary_edges = np.concatenate([
+            cell_indexes[:, hole_boundary].reshape(-1, 2),
+            self._create_border_edges(len(xs), len(ys)),
+        ])
+
+        frame_faces = self._create_frame_faces(len(xs), len(ys), x_first, y_first)
+
+        vertices = np.concatenate([grid_vertices, tiled_vertices])
+        faces = np.concatenate([faces, frame_faces])
+
+        height = self._thickness - self._contact_pad_thickness*2
+        return _extrude_triangulation(vertices, faces, boundary_edges, -height/2, height/2)
+
+    def _get_grid_lines(self, count: int, indent: float) -> Tuple[np.ndarray, int]:
+        # Node coordinates along one axis and the index of the first cell line, indent lines exist only for a non-zero indent
+        lines = indent + np.arange(count + 1)*self._step
+        if indent <= 0:
+            return lines, 0
+        return np.array([0, *lines, self._step*count + indent*2]), 1
+
+    def _create_frame_faces(self, x_lines_count: int, y_lines_count: int, x_first: int, y_first: int) -> np.ndarray:
+        i, j = np.meshgrid(np.arange(x_lines_count - 1), np.arange(y_lines_count - 1), indexing='ij')
+        i, j = i.ravel(), j.ravel()
+
+        is_cell = (i >= x_first) & (i < x_first + self._x_count) & (j >= y_first) & (j < y_first + self._y_count)
+        i, j = i[~is_cell], j[~is_cell]
+
+        def node(node_i: np.ndarray, node_j: np.ndarray) -> np.ndarray:
+            return node_i*y_lines_count + node_j
+
+        return np.concatenate([
+            np.column_stack([node(i, j), node(i + 1, j), node(i + 1, j + 1)]),
+            np.column_stack([node(i, j), node(i + 1, j + 1), node(i, j + 1)]),
+        ])
+
+    @staticmethod
+    def _create_border_edges(x_lines_count: int, y_lines_count: int) -> np.ndarray:
+        # Grid nodes around the border counterclockwise, every consecutive pair is an edge
+        last_i = x_lines_count - 1
+        last_j = y_lines_count - 1
+        border_i = np.concatenate([np.arange(last_i), np.full(last_j, last_i), np.arange(last_i, 0, -1), np.zeros(last_j, dtype=np.int64)])
+        border_j = np.concatenate([np.zeros(last_i, dtype=np.int64), np.arange(last_j), np.full(last_i, last_j), np.arange(last_j, 0, -1)])
+        border = border_i*y_lines_count + border_j
+        return np.column_stack([border, np.roll(border, -1)])
+
+    def _get_cell_centers(self) -> np.ndarray:
+        i, j = np.meshgrid(np.arange(self._x_count), np.arange(self._y_count), indexing='ij')
+        return np.column_stack([
+            self._x_indent + self._step/2 + i.ravel()*self._step,
+            self._y_indent + self._step/2 + j.ravel()*self._step,
+        ])
+
+
+def _get_boundary_edges(faces: np.ndarray) -> np.ndarray:
+    # Directed edges of counterclockwise faces without a reversed twin, the interior is on their left
+    edges = {(int(a), int(b)) for a, b in faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)}
+    return np.array([edge for edge in edges if edge[::-1] not in edges], dtype=np.int64).reshape(-1, 2)
+
+
+def _extrude_triangulation(vertices: np.ndarray, faces: np.ndarray, boundary_edges: np.ndarray, bottom: float, top: float) -> trimesh.Trimesh:
+    # Same as trimesh.creation.extrude_triangulation for a conforming triangulation with known boundary,
+    # but without merging vertices of the whole mesh again
+    count = len(vertices)
+    vertices_3d = np.concatenate([
+        np.column_stack([vertices, np.full(count, bottom)]),
+        np.column_stack([vertices, np.full(count, top)]),
+    ])
+
+    start, end = boundary_edges[:, 0], boundary_edges[:, 1]
+    faces_3d = np.concatenate([
+        faces[:, ::-1],
+        faces + count,
+        np.column_stack([start, end, end + count]),
+        np.column_stack([start, end + count, start + count]),
+    ])
+
+    return trimesh.Trimesh(vertices=vertices_3d, faces=faces_3d, process=False)
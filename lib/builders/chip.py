@@ -3,12 +3,14 @@ from typing import Optional
 
 import numpy as np
 import trimesh
-from trimeshtools.combine import union_meshes, concatenate_meshes
+from trimeshtools.combine import concatenate_meshes
 from trimeshtools.move import move_to_bound
 from trimeshtools.rotate import create_rotation_matrix_for_z, create_mirror_matrix
 
 from lib.base import BaseMeshBuilder, FloatPosition3d, Rotation, PositionSide
-from lib.utils.mesh import create_pin_mesh, create_text_mesh
+from lib.utils.boolean import boolean_difference
+from lib.utils.mesh import create_pin_mesh, create_text_mesh, union_components
+from lib.utils.primitives import create_cylinder
 
 
 class ChipBuilder(BaseMeshBuilder):
@@ -64,10 +66,10 @@ class ChipBuilder(BaseMeshBuilder):
 
     def build(self) -> trimesh.Trimesh:
         box_mesh = trimesh.creation.box([self._x_count*self._step, self._y_count*self._step, self._thickness])
-        box_diff = trimesh.creation.cylinder(radius=self._pit_radius, height=self._pit_height)
+        box_diff = create_cylinder(self._pit_radius, self._pit_height)
         move_to_bound(box_mesh, -1, 0, -1)
         move_to_bound(box_diff, 0, 0, -1)
-        box_mesh = box_mesh.difference(box_diff)
+        box_mesh = boolean_difference(box_mesh, box_diff)
         box_mesh.visual.face_colors = self._color
 
         pins_offset = (box_mesh.extents[0] - ((self._x_count-1)*self._step + self._pin_top_width))/2
@@ -82,7 +84,7 @@ class ChipBuilder(BaseMeshBuilder):
         left_pins = []
         for i in range(self._x_count):
             left_pins.append(pin_mesh.copy().apply_translation([i*self._step, 0, 0]))
-        left_pins_mesh = union_meshes(*left_pins)
+        left_pins_mesh = union_components(left_pins)
         left_pins_mesh.apply_translation([pins_offset, 0, 0])
         left_pins_mesh.visual.face_colors = self._contacts_color
 
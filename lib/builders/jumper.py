@@ -2,12 +2,14 @@ import math
 
 import numpy as np
 import trimesh
-from trimeshtools.combine import union_meshes, concatenate_meshes
+from trimeshtools.combine import concatenate_meshes
 from trimeshtools.move import move_to_bound
 from trimeshtools.rotate import create_rotation_matrix_for_x, create_rotation_matrix_for_z
 
 from lib.base import BaseMeshBuilder, PositionSide, Rotation, FloatPosition3d
 from lib.constants import CYLINDER_SECTIONS
+from lib.utils.boolean import boolean_union
+from lib.utils.primitives import create_cylinder, create_icosphere
 
 
 class JumperBuilder(BaseMeshBuilder):
@@ -52,29 +54,29 @@ class JumperBuilder(BaseMeshBuilder):
         length = ((self._x_count-1)**2 + (self._y_count-1)**2)**(1/2) * self._step - self._step_delta*2
         angle = -math.atan2(self._y_count-1, self._x_count-1)
 
-        sphere_mesh = trimesh.creation.icosphere(radius=self._contact_radius)
-        cylinder_mesh = trimesh.creation.cylinder(radius=self._contact_radius, height=length, sections=CYLINDER_SECTIONS)
+        sphere_mesh = create_icosphere(self._contact_radius)
+        cylinder_mesh = create_cylinder(self._contact_radius, length, CYLINDER_SECTIONS)
         cylinder_mesh.apply_transform(create_rotation_matrix_for_x(math.pi / 2))
         cylinder_mesh.apply_transform(create_rotation_matrix_for_z(math.pi / 2))
 
         move_to_bound(sphere_mesh, 0, 0, 0)
         move_to_bound(cylinder_mesh, 1, 0, 0)
-        wire_mesh = union_meshes(cylinder_mesh, sphere_mesh)
+        wire_mesh = boolean_union(cylinder_mesh, sphere_mesh)
 
         move_to_bound(wire_mesh, -1, 0, 0)
-        wire_mesh = union_meshes(wire_mesh, sphere_mesh)
+        wire_mesh = boolean_union(wire_mesh, sphere_mesh)
 
-        left_contact_mesh = trimesh.creation.cylinder(radius=self._contact_radius, height=self._contact_height, sections=CYLINDER_SECTIONS)
+        left_contact_mesh = create_cylinder(self._contact_radius, self._contact_height, CYLINDER_SECTIONS)
         move_to_bound(left_contact_mesh, 1, 0, -1)
         right_contact_mesh = left_contact_mesh.copy().apply_translation([length, 0, 0])
-        contacts_mesh = union_meshes(left_contact_mesh, right_contact_mesh)
+        contacts_mesh = boolean_union(left_contact_mesh, right_contact_mesh)
 
         move_to_bound(contacts_mesh, 0, 0, -1)
         move_to_bound(wire_mesh, 0, 0, 0)
-        wire_mesh = union_meshes(wire_mesh, contacts_mesh)
+        wire_mesh = boolean_union(wire_mesh, contacts_mesh)
         wire_mesh.visual.face_colors = self._contact_color
 
-        cylinder_mesh = trimesh.creation.cylinder(radius=self._radius, height=length-self._contact_radius*2)
+        cylinder_mesh = create_cylinder(self._radius, length-self._contact_radius*2)
         cylinder_mesh.apply_transform(create_rotation_matrix_for_x(math.pi / 2))
         cylinder_mesh.apply_transform(create_rotation_matrix_for_z(math.pi / 2))
         cylinder_mesh.visual.face_colors = self._color
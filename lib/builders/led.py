@@ -1,10 +1,12 @@
 import numpy as np
 import trimesh
-from trimeshtools.combine import union_meshes, concatenate_meshes
+from trimeshtools.combine import concatenate_meshes
 from trimeshtools.move import move_to_bound
 
 from lib.base import BaseMeshBuilder, PositionSide, Rotation, FloatPosition3d
 from lib.constants import CYLINDER_SECTIONS
+from lib.utils.boolean import boolean_union
+from lib.utils.primitives import create_cylinder, create_icosphere
 
 
 class LedBuilder(BaseMeshBuilder):
@@ -41,28 +43,28 @@ class LedBuilder(BaseMeshBuilder):
         self._color_contact = color_contact
 
     def build(self) -> trimesh.Trimesh:
-        sphere = trimesh.creation.icosphere(radius=self._radius)
-        cylinder = trimesh.creation.cylinder(radius=self._radius, height=self._height-self._radius, sections=CYLINDER_SECTIONS)
-        cylinder_base = trimesh.creation.cylinder(radius=self._radius + self._contact_radius, height=self._contact_radius, sections=CYLINDER_SECTIONS)
+        sphere = create_icosphere(self._radius)
+        cylinder = create_cylinder(self._radius, self._height-self._radius, CYLINDER_SECTIONS)
+        cylinder_base = create_cylinder(self._radius + self._contact_radius, self._contact_radius, CYLINDER_SECTIONS)
         move_to_bound(sphere, 0, 0, 0)
         move_to_bound(cylinder, 0, 0, -1)
-        top_mesh = union_meshes(sphere, cylinder)
+        top_mesh = boolean_union(sphere, cylinder)
         move_to_bound(top_mesh, 0, 0, 1)
         move_to_bound(cylinder_base, 0, 0, -1)
-        top_mesh = union_meshes(top_mesh, cylinder_base)
+        top_mesh = boolean_union(top_mesh, cylinder_base)
         top_mesh.visual.face_colors = self._color
 
-        anode_mesh = trimesh.creation.cylinder(radius=self._contact_radius, height=self._anode_length, sections=CYLINDER_SECTIONS)
+        anode_mesh = create_cylinder(self._contact_radius, self._anode_length, CYLINDER_SECTIONS)
         move_to_bound(anode_mesh, 0, 0, 0)
         anode_mesh.apply_translation([-self._anode_cathode_distance/2, 0, 0])
 
-        cathode_mesh = trimesh.creation.cylinder(radius=self._contact_radius, height=self._cathode_length, sections=CYLINDER_SECTIONS)
+        cathode_mesh = create_cylinder(self._contact_radius, self._cathode_length, CYLINDER_SECTIONS)
         move_to_bound(cathode_mesh, 0, 0, 0)
         cathode_mesh.apply_translation([self._anode_cathode_distance/2, 0, 0])
 
         move_to_bound(anode_mesh, z=-1)
         move_to_bound(cathode_mesh, z=-1)
-        contacts_mesh = union_meshes(anode_mesh, cathode_mesh)
+        contacts_mesh = boolean_union(anode_mesh, cathode_mesh)
         contacts_mesh.visual.face_colors = self._color_contact
 
         move_to_bound(top_mesh, 0, 0, 1)
@@ -3,13 +3,15 @@ from typing import Optional
 
 import numpy as np
 import trimesh
-from trimeshtools.combine import union_meshes, concatenate_meshes
+from trimeshtools.combine import concatenate_meshes
 from trimeshtools.move import move_to_bound
 from trimeshtools.rotate import create_rotation_matrix_for_x, create_rotation_matrix_for_z
 
 from lib.base import BaseMeshBuilder, Rotation, FloatPosition3d, PositionSide
 from lib.constants import CYLINDER_SECTIONS
+from lib.utils.boolean import boolean_union
 from lib.utils.mesh import create_bounded_pipe_mesh, create_text_mesh
+from lib.utils.primitives import create_cylinder, create_icosphere
 
 
 class ResistorBuilder(BaseMeshBuilder):
@@ -49,32 +51,32 @@ class ResistorBuilder(BaseMeshBuilder):
         self._text = text
 
     def build(self) -> trimesh.Trimesh:
-        left_sphere = trimesh.creation.icosphere(radius=self._radius)
-        right_sphere = trimesh.creation.icosphere(radius=self._radius)
+        left_sphere = create_icosphere(self._radius)
+        right_sphere = create_icosphere(self._radius)
 
         left_sphere.apply_translation([-self._length/2, 0, 0])
         right_sphere.apply_translation([self._length/2, 0, 0])
 
-        cylinder = trimesh.creation.cylinder(radius=self._radius, height=self._length, sections=CYLINDER_SECTIONS)
+        cylinder = create_cylinder(self._radius, self._length, CYLINDER_SECTIONS)
         cylinder.apply_transform(create_rotation_matrix_for_x(math.pi/2))
         cylinder.apply_transform(create_rotation_matrix_for_z(math.pi/2))
 
-        final_mesh = union_meshes(left_sphere, cylinder, right_sphere)
+        final_mesh = boolean_union(left_sphere, cylinder, right_sphere)
         move_to_bound(final_mesh, 0, 0)
 
         left_wire = create_bounded_pipe_mesh(pipe_radius=self._wire_contact_radius, bond_radius=self._wire_bond_radius, horizontal_length=self._wire_horizontal_length, vertical_length=self._wire_vertical_length)
         right_wire = left_wire.copy().apply_transform(create_rotation_matrix_for_z(math.pi))
-        center_wire = trimesh.creation.cylinder(radius=self._wire_contact_radius, height=self._length, sections=CYLINDER_SECTIONS)
+        center_wire = create_cylinder(self._wire_contact_radius, self._length, CYLINDER_SECTIONS)
         center_wire.apply_transform(create_rotation_matrix_for_x(math.pi/2))
         center_wire.apply_transform(create_rotation_matrix_for_z(math.pi/2))
 
         move_to_bound(center_wire, 1)
         move_to_bound(left_wire, -1)
-        contacts_mesh = union_meshes(center_wire, left_wire)
+        contacts_mesh = boolean_union(center_wire, left_wire)
 
         move_to_bound(contacts_mesh, -1)
         move_to_bound(right_wire, 1)
-        contacts_mesh = union_meshes(contacts_mesh, right_wire)
+        contacts_mesh = boolean_union(contacts_mesh, right_wire)
 
         move_to_bound(contacts_mesh, 0, 0)
 
@@ -3,12 +3,15 @@ from typing import Tuple, List
 
 import numpy as np
 import trimesh
-from trimeshtools.combine import union_meshes, concatenate_meshes
+from trimeshtools.combine import concatenate_meshes
 from trimeshtools.move import move_to_bound
 from trimeshtools.rotate import create_rotation_matrix_for_x, create_rotation_matrix_for_z
 
 from lib.base import BaseMeshBuilder, PositionSide, Rotation, FloatPosition3d
 from lib.constants import CYLINDER_SECTIONS
+from lib.utils.boolean import boolean_difference
+from lib.utils.mesh import union_components
+from lib.utils.primitives import create_cylinder
 
 
 class SocketBuilder(BaseMeshBuilder):
@@ -61,15 +64,15 @@ class SocketBuilder(BaseMeshBuilder):
         socket_depth = (self._x_count/2)*self._step
 
         box_mesh = trimesh.creation.box([self._x_count*self._step, self._y_count*self._step, self._thickness])
-        box_diff = trimesh.creation.cylinder(radius=self._socket_radius, height=socket_depth, sections=CYLINDER_SECTIONS)
+        box_diff = create_cylinder(self._socket_radius, socket_depth, CYLINDER_SECTIONS)
         box_diff.apply_transform(create_rotation_matrix_for_x(math.pi/2))
         box_diff.apply_transform(create_rotation_matrix_for_z(math.pi/2))
         move_to_bound(box_mesh, -1, 0, 0)
         move_to_bound(box_diff, -1, 0, 0)
-        box_mesh = box_mesh.difference(box_diff)
+        box_mesh = boolean_difference(box_mesh, box_diff)
         box_mesh.visual.face_colors = self._color
 
-        socket_pin_mesh = trimesh.creation.cylinder(radius=self._socket_pin_radius, height=socket_depth, sections=CYLINDER_SECTIONS)
+        socket_pin_mesh = create_cylinder(self._socket_pin_radius, socket_depth, CYLINDER_SECTIONS)
         socket_pin_mesh.apply_transform(create_rotation_matrix_for_x(math.pi/2))
         socket_pin_mesh.apply_transform(create_rotation_matrix_for_z(math.pi/2))
         socket_pin_mesh.visual.face_colors = self._contacts_color
@@ -100,7 +103,7 @@ class SocketBuilder(BaseMeshBuilder):
             pin_mesh.apply_translation([x*self._step, y*self._step, 0])
             pins.append(pin_mesh)
 
-        pins_mesh = union_meshes(*pins)
+        pins_mesh = union_components(pins)
         pins_mesh.visual.face_colors = self._contacts_color
 
         move_to_bound(final_mesh, 1, 1, 1)
@@ -2,11 +2,14 @@ import math
 
 import numpy as np
 import trimesh
-from trimeshtools.combine import union_meshes, concatenate_meshes
+from trimeshtools.combine import concatenate_meshes
 from trimeshtools.move import move_to_bound
 from trimeshtools.rotate import create_rotation_matrix_for_x, create_rotation_matrix_for_z
 
 from lib.base import BaseMeshBuilder, PositionSide, Rotation, FloatPosition3d
+from lib.utils.boolean import boolean_union
+from lib.utils.mesh import clip_mesh, create_half_sphere
+from lib.utils.primitives import create_cylinder, create_icosphere
 
 
 class TrackBuilder(BaseMeshBuilder):
@@ -40,24 +43,22 @@ class TrackBuilder(BaseMeshBuilder):
         angle = -math.atan2(self._y_count-1, self._x_count-1)
 
         if self._x_count != 1 or self._y_count != 1:
-            sphere_mesh = trimesh.creation.icosphere(radius=self._radius)
-            cylinder_mesh = trimesh.creation.cylinder(radius=self._radius, height=length)
+            sphere_mesh = create_icosphere(self._radius)
+            cylinder_mesh = create_cylinder(self._radius, length)
             cylinder_mesh.apply_transform(create_rotation_matrix_for_x(math.pi/2))
             cylinder_mesh.apply_transform(create_rotation_matrix_for_z(math.pi/2))
 
             move_to_bound(sphere_mesh, 0, 0, 0)
             move_to_bound(cylinder_mesh, 1, 0, 0)
-            final_mesh = union_meshes(cylinder_mesh, sphere_mesh)
+            final_mesh = boolean_union(cylinder_mesh, sphere_mesh)
 
             move_to_bound(final_mesh, -1, 0, 0)
-            final_mesh = union_meshes(final_mesh, sphere_mesh)
-        else:
-            final_mesh = trimesh.creation.icosphere(radius=self._radius)
+            final_mesh = boolean_union(final_mesh, sphere_mesh)
 
-        diff_mesh = trimesh.creation.box([(length+1)*2, (length+1)*2, (length+1)*2])
-        move_to_bound(final_mesh, 0, 0, 0)
-        move_to_bound(diff_mesh, 0, 0, -1)
-        final_mesh = final_mesh.difference(diff_mesh)
+            move_to_bound(final_mesh, 0, 0, 0)
+            final_mesh = clip_mesh(final_mesh, [0, 0, 0], [0, 0, 1])
+        else:
+            final_mesh = create_half_sphere(self._radius)
 
         final_mesh.apply_transform(create_rotation_matrix_for_z(angle))
         final_mesh.visual.face_colors = self._color
@@ -5,6 +5,7 @@ from trimeshtools.move import move_to_bound
 
 from lib.base import BaseMeshBuilder, PositionSide, Rotation, FloatPosition3d
 from lib.constants import CYLINDER_SECTIONS
+from lib.utils.primitives import create_cylinder
 
 
 class WireBuilder(BaseMeshBuilder):
@@ -35,10 +36,10 @@ class WireBuilder(BaseMeshBuilder):
         self._contact_color = contact_color
 
     def build(self) -> trimesh.Trimesh:
-        contact_cylinder = trimesh.creation.cylinder(radius=self._contact_radius, height=self._length, sections=CYLINDER_SECTIONS)
+        contact_cylinder = create_cylinder(self._contact_radius, self._length, CYLINDER_SECTIONS)
         contact_cylinder.visual.face_colors = self._contact_color
 
-        wire_cylinder = trimesh.creation.cylinder(radius=self._radius, height=self._length - self._contact_length*2, sections=CYLINDER_SECTIONS)
+        wire_cylinder = create_cylinder(self._radius, self._length - self._contact_length*2, CYLINDER_SECTIONS)
         wire_cylinder.visual.face_colors = self._color
 
         move_to_bound(contact_cylinder, 0, 0, 0)
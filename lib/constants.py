@@ -2,6 +2,8 @@ import os
 import numpy as np
 
 CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache')
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+PRIMITIVE_CACHE_MAX_BYTES = 64 * 1024 * 1024
 
 CYLINDER_SECTIONS = 32
 
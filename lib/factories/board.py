@@ -1,11 +1,12 @@
 from lib.base import BaseMeshBuilder
-from lib.builders.board import BoardBuilder
+from lib.builders.board import BoardBuilder, AnalyticBoardBuilder
 from lib.constants import BOARD_GRID_STEP, BOARD_PAD_RADIUS, BOARD_THICKNESS, BOARD_CONTACT_PAD_RADIUS, \
     BOARD_CONTACT_PAD_THICKNESS, BOARD_COLOR, BOARD_CONTACT_PAD_COLOR
 
 
-def create_board_builder(x_count: int, y_count: int, x_indent: float = 0, y_indent: float = 0) -> BaseMeshBuilder:
-    return BoardBuilder(
+def create_board_builder(x_count: int, y_count: int, x_indent: float = 0, y_indent: float = 0, analytic: bool = False) -> BaseMeshBuilder:
+    builder_class = AnalyticBoardBuilder if analytic else BoardBuilder
+    return builder_class(
         x_count=x_count,
         y_count=y_count,
         step=BOARD_GRID_STEP,
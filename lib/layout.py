@@ -0,0 +1,98 @@
+from typing import List, Dict, Iterator
+
+import numpy as np
+import trimesh
+
+from lib.base import BaseMeshBuilder, GridPlacer, IntPosition2d, PositionSide, Rotation
+
+
+class Placement:
+    builder: BaseMeshBuilder
+    position: IntPosition2d
+    side: PositionSide
+    rotation: Rotation
+
+    def __init__(self, builder: BaseMeshBuilder, position: IntPosition2d, side: PositionSide, rotation: Rotation):
+        self.builder = builder
+        self.position = position
+        self.side = side
+        self.rotation = rotation
+
+
+class Layout:
+    """
+    Declarative list of part placements.
+
+    Nothing is built while the layout is filled, so the whole plan can be inspected first.
+    place() builds every unique part once and then places all its copies.
+    """
+    _placements: List[Placement]
+
+    def __init__(self):
+        self._placements = []
+
+    def add(self, builder: BaseMeshBuilder, position: IntPosition2d, side: PositionSide, rotation: Rotation) -> "Layout":
+        self._placements.append(Placement(builder=builder, position=position, side=side, rotation=rotation))
+        return self
+
+    @property
+    def placements(self) -> List[Placement]:
+        return list(self._placements)
+
+    @property
+    def builders(self) -> List[BaseMeshBuilder]:
+        return [placements[0].builder for placements in self.plan().values()]
+
+    def plan(self) -> Dict[str, List[Placement]]:
+        # Placements grouped by the cache key of their builder, in order of first appearance
+        groups: Dict[str, List[Placement]] = {}
+        for placement in self._placements:
+            groups.setdefault(placement.builder.cache_key, []).append(placement)
+        return groups
+
+    def place(self, placer: GridPlacer) -> List[trimesh.Trimesh]:
+        placed: Dict[int, trimesh.Trimesh] = {}
+
+        for placements in self.plan().values():
+            meshes = placer.place_many(
+                placements[0].builder,
+                [(placement.position, placement.side, placement.rotation) for placement in placements],
+            )
+            placed.update((id(placement), mesh) for placement, mesh in zip(placements, meshes))
+
+        # Keep the order in which the placements were added
+        return [placed[id(placement)] for placement in self._placements]
+
+    def get_bounds(self, placer: GridPlacer) -> np.ndarray:
+        # Bounds of the whole assembly, known before streaming it with place_iter()
+        bounds = np.array([
+            placer.get_placed_bounds(
+                placements[0].builder,
+                [(placement.position, placement.side, placement.rotation) for placement in placements],
+            )
+            for placements in self.plan().values()
+        ])
+        return np.array([bounds[:, 0].min(axis=0), bounds[:, 1].max(axis=0)])
+
+    def place_iter(self, placer: GridPlacer) -> Iterator[trimesh.Trimesh]:
+        # Yields placed parts one by one, e.g. for streaming export, without keeping them all in memory
+        for placement in self._placements:
+            yield placer.place(placement.builder, placement.position, placement.side, placement.rotation)
+
+    def place_scene(self, placer: GridPlacer) -> trimesh.Scene:
+        """
+        Instanced alternative to place(): the scene holds one geometry per unique part and one node
+        with a 4x4 transform per placement, so its glTF export uses mesh instancing.
+        """
+        scene = trimesh.Scene()
+
+        for cache_key, placements in self.plan().items():
+            mesh, transforms = placer.place_instances(
+                placements[0].builder,
+                [(placement.position, placement.side, placement.rotation) for placement in placements],
+            )
+            scene.add_geometry(mesh, geom_name=cache_key, node_name=f'{cache_key}_0', transform=transforms[0])
+            for i, transform in enumerate(transforms[1:], start=1):
+                scene.graph.update(frame_to=f'{cache_key}_{i}', frame_from=scene.graph.base_frame, matrix=transform, geometry=cache_key)
+
+        return scene
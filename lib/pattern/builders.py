@@ -1,12 +1,21 @@
-from typing import List
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Optional
 
+import numpy as np
 import shapely
 import trimesh
 from PIL import Image, ImageDraw
 from trimeshtools.move import move_to_bound
 
-from lib.constants import CYLINDER_SECTIONS
-from lib.pattern.structs import BoardPattern, Pin, Track
+from lib.constants import CYLINDER_SECTIONS, CACHE_MAX_BYTES
+from lib.pattern.geometry import create_pattern_geometry, create_board_polygon, get_tracks_ends, get_pin_centers, \
+    create_pin_polygons, create_track_polygons
+from lib.pattern.structs import BoardPattern, Pin, Track, as_track_array, as_pin_array
+from lib.utils.boolean import boolean_union, boolean_difference
+from lib.utils.cache import MeshCache
+from lib.utils.mesh import extrude_geometry, orient_faces_ccw, union_components
+from lib.utils.primitives import create_cylinder
 
 
 class BoardPatternImageBuilder:
@@ -61,14 +70,16 @@ class BoardPatternImageBuilder:
 
         return image
 
-    def _place_board(self, board: BoardPattern, draw: ImageDraw.ImageDraw) -> ImageDraw.ImageDraw:
-        left = self._mm_to_scaled_pixels(board.x_indent)
-        top = self._mm_to_scaled_pixels(board.y_indent)
-        right = self._mm_to_scaled_pixels(board.x_indent + board.x_count * self._step)
-        bottom = self._mm_to_scaled_pixels(board.y_indent + board.y_count * self._step)
+    def _place_board(self, board: BoardPattern, draw: ImageDraw.ImageDraw, offset: Tuple[int, int] = (0, 0)) -> ImageDraw.ImageDraw:
+        offset_x, offset_y = offset
 
-        left_outer = 0
-        top_outer = 0
+        left = self._mm_to_scaled_pixels(board.x_indent) - offset_x
+        top = self._mm_to_scaled_pixels(board.y_indent) - offset_y
+        right = self._mm_to_scaled_pixels(board.x_indent + board.x_count * self._step) - offset_x
+        bottom = self._mm_to_scaled_pixels(board.y_indent + board.y_count * self._step) - offset_y
+
+        left_outer = -offset_x
+        top_outer = -offset_y
         right_outer = right + self._mm_to_scaled_pixels(board.x_indent)
         bottom_outer = bottom + self._mm_to_scaled_pixels(board.y_indent)
 
@@ -77,22 +88,22 @@ class BoardPatternImageBuilder:
         if self._draw_grid:
             for x in range(board.x_count + 1):
                 x_pos_mm = board.x_indent + x * self._step
-                x_pos = self._mm_to_scaled_pixels(x_pos_mm)
+                x_pos = self._mm_to_scaled_pixels(x_pos_mm) - offset_x
                 draw.line([(x_pos, top), (x_pos, bottom)], fill='lightgray', width=1 * self._antialias_factor)
 
             for y in range(board.y_count + 1):
                 y_pos_mm = board.y_indent + y * self._step
-                y_pos = self._mm_to_scaled_pixels(y_pos_mm)
+                y_pos = self._mm_to_scaled_pixels(y_pos_mm) - offset_y
                 draw.line([(left, y_pos), (right, y_pos)], fill='lightgray', width=1 * self._antialias_factor)
 
         return draw
 
-    def _place_pin(self, pin: Pin, draw: ImageDraw.ImageDraw) -> ImageDraw.ImageDraw:
+    def _place_pin(self, pin: Pin, draw: ImageDraw.ImageDraw, offset: Tuple[int, int] = (0, 0)) -> ImageDraw.ImageDraw:
         center_x_mm = self._board_pattern.x_indent + pin.x * self._step + self._step / 2
         center_y_mm = self._board_pattern.y_indent + pin.y * self._step + self._step / 2
 
-        center_x = self._mm_to_scaled_pixels(center_x_mm)
-        center_y = self._mm_to_scaled_pixels(center_y_mm)
+        center_x = self._mm_to_scaled_pixels(center_x_mm) - offset[0]
+        center_y = self._mm_to_scaled_pixels(center_y_mm) - offset[1]
 
         radius_px = self._mm_to_scaled_pixels(pin.radius)
 
@@ -107,17 +118,17 @@ class BoardPatternImageBuilder:
 
         return draw
 
-    def _place_track(self, track: Track, draw: ImageDraw.ImageDraw) -> ImageDraw.ImageDraw:
+    def _place_track(self, track: Track, draw: ImageDraw.ImageDraw, offset: Tuple[int, int] = (0, 0)) -> ImageDraw.ImageDraw:
         start_x_mm = self._board_pattern.x_indent + track.x * self._step + self._step / 2
         start_y_mm = self._board_pattern.y_indent + track.y * self._step + self._step / 2
 
         end_x_mm = self._board_pattern.x_indent + (track.x + track.x_count) * self._step + self._step / 2
         end_y_mm = self._board_pattern.y_indent + (track.y + track.y_count) * self._step + self._step / 2
 
-        start_x = self._mm_to_scaled_pixels(start_x_mm)
-        start_y = self._mm_to_scaled_pixels(start_y_mm)
-        end_x = self._mm_to_scaled_pixels(end_x_mm)
-        end_y = self._mm_to_scaled_pixels(end_y_mm)
+        start_x = self._mm_to_scaled_pixels(start_x_mm) - offset[0]
+        start_y = self._mm_to_scaled_pixels(start_y_mm) - offset[1]
+        end_x = self._mm_to_scaled_pixels(end_x_mm) - offset[0]
+        end_y = self._mm_to_scaled_pixels(end_y_mm) - offset[1]
 
         width_px = max(self._antialias_factor, self._mm_to_scaled_pixels(track.width))
 
@@ -138,6 +149,238 @@ class BoardPatternImageBuilder:
         return draw
 
 
+class TiledBoardPatternImageBuilder(BoardPatternImageBuilder):
+    """
+    Renders the same image as BoardPatternImageBuilder tile by tile.
+
+    Every tile is drawn at the antialiasing scale with only the primitives intersecting it,
+    downsampled and pasted into the result, so the full supersampled canvas is never allocated.
+    Tiles are rendered in a thread pool.
+    """
+    _tile_size: int  # в пикселях итогового изображения
+    _max_workers: Optional[int]
+    _tracks_index: shapely.STRtree
+    _pins_index: shapely.STRtree
+
+    # Tiles are rendered with this margin (in final pixels) to cover the LANCZOS kernel support
+    _TILE_MARGIN = 3
+
+    def __init__(
+        self,
+        step: float,
+        board_pattern: BoardPattern,
+        dpi: int = 300,
+        antialias_factor: int = 4,
+        draw_grid: bool = True,
+        tile_size: int = 512,
+        max_workers: Optional[int] = None,
+    ):
+        super().__init__(step, board_pattern, dpi, antialias_factor, draw_grid)
+        self._tile_size = tile_size
+        self._max_workers = max_workers
+
+    def build(self):
+        width_mm = self._board_pattern.x_indent * 2 + self._board_pattern.x_count * self._step
+        height_mm = self._board_pattern.y_indent * 2 + self._board_pattern.y_count * self._step
+
+        final_width = self._mm_to_scaled_pixels(width_mm) // self._antialias_factor
+        final_height = self._mm_to_scaled_pixels(height_mm) // self._antialias_factor
+
+        self._tracks_index = shapely.STRtree([self._get_track_bbox(track) for track in self._tracks])
+        self._pins_index = shapely.STRtree([self._get_pin_bbox(pin) for pin in self._pins])
+
+        tiles = [
+            (left, top, min(left + self._tile_size, final_width), min(top + self._tile_size, final_height))
+            for top in range(0, final_height, self._tile_size)
+            for left in range(0, final_width, self._tile_size)
+        ]
+
+        image = Image.new('RGB', (final_width, final_height), color=(255, 255, 255))
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            for tile, tile_image in zip(tiles, executor.map(lambda tile: self._render_tile(tile, final_width, final_height), tiles)):
+                image.paste(tile_image, tile[:2])
+
+        return image
+
+    def _render_tile(self, tile: Tuple[int, int, int, int], final_width: int, final_height: int) -> Image.Image:
+        left, top, right, bottom = tile
+
+        outer_left = max(0, left - self._TILE_MARGIN)
+        outer_top = max(0, top - self._TILE_MARGIN)
+        outer_right = min(final_width, right + self._TILE_MARGIN)
+        outer_bottom = min(final_height, bottom + self._TILE_MARGIN)
+
+        factor = self._antialias_factor
+        offset = (outer_left * factor, outer_top * factor)
+        tile_bbox = shapely.box(outer_left * factor, outer_top * factor, outer_right * factor, outer_bottom * factor)
+
+        image = Image.new('RGBA', ((outer_right - outer_left) * factor, (outer_bottom - outer_top) * factor), color=(255, 255, 255, 255))
+        draw = ImageDraw.Draw(image)
+
+        draw = self._place_board(self._board_pattern, draw, offset)
+
+        for i in sorted(self._tracks_index.query(tile_bbox)):
+            draw = self._place_track(self._tracks[i], draw, offset)
+
+        for i in sorted(self._pins_index.query(tile_bbox)):
+            draw = self._place_pin(self._pins[i], draw, offset)
+
+        image = image.resize((outer_right - outer_left, outer_bottom - outer_top), Image.Resampling.LANCZOS)
+        image = image.convert('RGB')
+
+        return image.crop((left - outer_left, top - outer_top, right - outer_left, bottom - outer_top))
+
+    def _get_pin_bbox(self, pin: Pin) -> shapely.Polygon:
+        center_x = self._mm_to_scaled_pixels(self._board_pattern.x_indent + pin.x * self._step + self._step / 2)
+        center_y = self._mm_to_scaled_pixels(self._board_pattern.y_indent + pin.y * self._step + self._step / 2)
+        radius_px = self._mm_to_scaled_pixels(pin.radius) + self._antialias_factor
+
+        return shapely.box(center_x - radius_px, center_y - radius_px, center_x + radius_px, center_y + radius_px)
+
+    def _get_track_bbox(self, track: Track) -> shapely.Polygon:
+        start_x = self._mm_to_scaled_pixels(self._board_pattern.x_indent + track.x * self._step + self._step / 2)
+        start_y = self._mm_to_scaled_pixels(self._board_pattern.y_indent + track.y * self._step + self._step / 2)
+        end_x = self._mm_to_scaled_pixels(self._board_pattern.x_indent + (track.x + track.x_count) * self._step + self._step / 2)
+        end_y = self._mm_to_scaled_pixels(self._board_pattern.y_indent + (track.y + track.y_count) * self._step + self._step / 2)
+        radius_px = max(self._antialias_factor, self._mm_to_scaled_pixels(track.width)) + self._antialias_factor
+
+        return shapely.box(min(start_x, end_x) - radius_px, min(start_y, end_y) - radius_px, max(start_x, end_x) + radius_px, max(start_y, end_y) + radius_px)
+
+
+class SdfBoardPatternImageBuilder(BoardPatternImageBuilder):
+    """
+    Renders the pattern directly at the target resolution with NumPy instead of PIL supersampling.
+
+    Tracks are capsules and pins are discs, their antialiased coverage is computed analytically
+    from the signed distance of every pixel center. The image is processed in chunks of rows,
+    and every primitive is evaluated only inside its own bounding box.
+    """
+    _rows_per_chunk: int
+
+    _GRID_COLOR = (211, 211, 211)  # lightgray
+    _OUTLINE_COLOR = (128, 128, 128)  # gray
+
+    def __init__(self, step: float, board_pattern: BoardPattern, dpi: int = 300, draw_grid: bool = True, rows_per_chunk: int = 256):
+        super().__init__(step, board_pattern, dpi, antialias_factor=1, draw_grid=draw_grid)
+        self._rows_per_chunk = rows_per_chunk
+
+    def build(self):
+        width_mm = self._board_pattern.x_indent * 2 + self._board_pattern.x_count * self._step
+        height_mm = self._board_pattern.y_indent * 2 + self._board_pattern.y_count * self._step
+
+        width_px = self._mm_to_pixels(width_mm)
+        height_px = self._mm_to_pixels(height_mm)
+
+        capsules = self._get_capsules()
+        boxes = self._get_board_boxes(width_mm, height_mm)
+
+        # Capsule bounding boxes to select the primitives touching every chunk
+        capsules_top = np.minimum(capsules[:, 1], capsules[:, 3]) - capsules[:, 4] - 1
+        capsules_bottom = np.maximum(capsules[:, 1], capsules[:, 3]) + capsules[:, 4] + 1
+
+        pixels = np.empty((height_px, width_px, 3), dtype=np.uint8)
+        xs = np.arange(width_px, dtype=np.float32) + 0.5
+
+        for top in range(0, height_px, self._rows_per_chunk):
+            bottom = min(height_px, top + self._rows_per_chunk)
+            ys = np.arange(top, bottom, dtype=np.float32) + 0.5
+
+            color = np.full((bottom - top, width_px, 3), 255, dtype=np.float32)
+            for box, box_color in boxes:
+                coverage = self._get_box_coverage(box, xs, ys)[:, :, np.newaxis]
+                color = color * (1 - coverage) + np.array(box_color, dtype=np.float32) * coverage
+
+            coverage = np.zeros((bottom - top, width_px), dtype=np.float32)
+            for i in np.nonzero((capsules_top < bottom) & (capsules_bottom > top))[0]:
+                self._add_capsule_coverage(coverage, capsules[i], xs, ys)
+
+            color *= (1 - coverage)[:, :, np.newaxis]
+            pixels[top:bottom] = np.rint(color).astype(np.uint8)
+
+        return Image.fromarray(pixels, mode='RGB')
+
+    def _get_capsules(self) -> np.ndarray:
+        # Each primitive is (start_x, start_y, end_x, end_y, radius) in pixels, pins are zero-length capsules
+        scale = self._dpi / 25.4
+        indent = np.array([self._board_pattern.x_indent, self._board_pattern.y_indent])
+
+        track_ends = get_tracks_ends(self._tracks, self._step) + indent
+        track_radii = np.maximum(as_track_array(self._tracks).data['width'] / 2, 0.5 / scale)
+
+        pin_centers = get_pin_centers(self._pins, self._step) + indent
+        pin_radii = as_pin_array(self._pins).data['radius']
+
+        capsules = np.concatenate([
+            np.column_stack([track_ends.reshape(-1, 4), track_radii]),
+            np.column_stack([pin_centers, pin_centers, pin_radii]),
+        ])
+
+        return (capsules * scale).astype(np.float32)
+
+    def _get_board_boxes(self, width_mm: float, height_mm: float) -> List[Tuple[Tuple[float, float, float, float], Tuple[int, int, int]]]:
+        scale = self._dpi / 25.4
+        board = self._board_pattern
+        boxes = []
+
+        if self._draw_grid:
+            top = board.y_indent * scale
+            bottom = (board.y_indent + board.y_count * self._step) * scale
+            left = board.x_indent * scale
+            right = (board.x_indent + board.x_count * self._step) * scale
+
+            for x in range(board.x_count + 1):
+                x_pos = (board.x_indent + x * self._step) * scale
+                boxes.append(((x_pos - 0.5, top, x_pos + 0.5, bottom), self._GRID_COLOR))
+
+            for y in range(board.y_count + 1):
+                y_pos = (board.y_indent + y * self._step) * scale
+                boxes.append(((left, y_pos - 0.5, right, y_pos + 0.5), self._GRID_COLOR))
+
+        # Two pixels wide outline along the inner side of the board border
+        width = width_mm * scale
+        height = height_mm * scale
+        boxes.extend([
+            ((0, 0, width, 2), self._OUTLINE_COLOR),
+            ((0, height - 2, width, height), self._OUTLINE_COLOR),
+            ((0, 0, 2, height), self._OUTLINE_COLOR),
+            ((width - 2, 0, width, height), self._OUTLINE_COLOR),
+        ])
+
+        return boxes
+
+    @staticmethod
+    def _get_box_coverage(box: Tuple[float, float, float, float], xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        # Exact area of every pixel covered by an axis-aligned box
+        left, top, right, bottom = box
+        coverage_x = np.clip(np.minimum(xs + 0.5, right) - np.maximum(xs - 0.5, left), 0, 1)
+        coverage_y = np.clip(np.minimum(ys + 0.5, bottom) - np.maximum(ys - 0.5, top), 0, 1)
+        return coverage_y[:, np.newaxis] * coverage_x[np.newaxis, :]
+
+    @staticmethod
+    def _add_capsule_coverage(coverage: np.ndarray, capsule: np.ndarray, xs: np.ndarray, ys: np.ndarray) -> None:
+        start_x, start_y, end_x, end_y, radius = capsule
+
+        # Evaluate only the pixels inside the capsule bounding box
+        column_from = max(0, int(min(start_x, end_x) - radius - 1))
+        column_to = min(len(xs), int(max(start_x, end_x) + radius + 2))
+        row_from = max(0, int(np.searchsorted(ys, min(start_y, end_y) - radius - 1)))
+        row_to = min(len(ys), int(np.searchsorted(ys, max(start_y, end_y) + radius + 1)) + 1)
+        if column_from >= column_to or row_from >= row_to:
+            return
+
+        px = xs[np.newaxis, column_from:column_to] - start_x
+        py = ys[row_from:row_to, np.newaxis] - start_y
+        dx = end_x - start_x
+        dy = end_y - start_y
+
+        length_sq = dx * dx + dy * dy
+        h = np.clip((px * dx + py * dy) / length_sq, 0, 1) if length_sq > 0 else 0
+        distance = np.hypot(px - dx * h, py - dy * h) - radius
+
+        window = coverage[row_from:row_to, column_from:column_to]
+        np.maximum(window, np.clip(0.5 - distance, 0, 1), out=window)
+
+
 class BoardPatternMeshBuilder:
     _step: float  # в мм
     _board_pattern: BoardPattern
@@ -155,13 +398,13 @@ class BoardPatternMeshBuilder:
     def build(self) -> trimesh.Trimesh:
         final_mesh = self._place_board(self._board_pattern)
 
-        for track in self._tracks:
-            final_mesh = self._place_track(track, final_mesh)
-
-        for pin in self._pins:
-            final_mesh = self._place_pin(pin, final_mesh)
+        primitive_meshes = [mesh for track in self._tracks for mesh in self._create_track_meshes(track)]
+        primitive_meshes += [self._create_pin_mesh(pin) for pin in self._pins]
+        if len(primitive_meshes) == 0:
+            return final_mesh
 
-        return final_mesh
+        # Tracks and pins are united first, so the board takes a single difference
+        return boolean_difference(final_mesh, union_components(primitive_meshes))
 
     def _place_board(self, board: BoardPattern) -> trimesh.Trimesh:
         width = board.x_indent*2 + board.x_count*self._step
@@ -174,22 +417,36 @@ class BoardPatternMeshBuilder:
         return final_mesh
 
     def _place_pin(self, pin: Pin, final_mesh: trimesh.Trimesh) -> trimesh.Trimesh:
+        return boolean_difference(final_mesh, self._create_pin_mesh(pin))
+
+    def _create_pin_mesh(self, pin: Pin) -> trimesh.Trimesh:
         center_x = pin.x*self._step + self._step/2
         center_y = pin.y*self._step + self._step/2
 
-        pin = trimesh.creation.cylinder(radius=pin.radius, height=self._thickness*2, sections=CYLINDER_SECTIONS)
+        pin = create_cylinder(pin.radius, self._thickness*2, CYLINDER_SECTIONS)
         pin.apply_translation([center_x, center_y, 0])
 
-        final_mesh = final_mesh.difference(pin)
-        return final_mesh
+        return pin
 
     def _place_track(self, track: Track, final_mesh: trimesh.Trimesh) -> trimesh.Trimesh:
+        for mesh in self._create_track_meshes(track):
+            final_mesh = boolean_difference(final_mesh, mesh)
+        return final_mesh
+
+    def _create_track_meshes(self, track: Track) -> List[trimesh.Trimesh]:
         start_x = track.x*self._step + self._step/2
         start_y = track.y*self._step + self._step/2
 
         end_x = (track.x + track.x_count)*self._step + self._step/2
         end_y = (track.y + track.y_count)*self._step + self._step/2
 
+        cylinder_mesh = create_cylinder(track.width/2, self._thickness*2, CYLINDER_SECTIONS)
+        cylinder_mesh.apply_translation([start_x, start_y, 0])
+
+        # A zero-length track is only its start disc, there is nothing to sweep
+        if track.x_count == 0 and track.y_count == 0:
+            return [cylinder_mesh]
+
         # Create a line segment for the track path
         track_line = trimesh.load_path([
             [start_x, start_y, 0],
@@ -214,14 +471,7 @@ class BoardPatternMeshBuilder:
             path=track_line.vertices
         )
 
-        # Subtract the track from the board
-        final_mesh = final_mesh.difference(track_mesh)
-
-        cylinder_mesh = trimesh.creation.cylinder(radius=track.width/2, height=self._thickness*2, sections=CYLINDER_SECTIONS)
-        cylinder_mesh.apply_translation([start_x, start_y, 0])
-        final_mesh = final_mesh.difference(cylinder_mesh)
-
-        return final_mesh
+        return [track_mesh, cylinder_mesh]
 
 
 class ReliefBoardPatternMeshBuilder:
@@ -243,13 +493,12 @@ class ReliefBoardPatternMeshBuilder:
     def build(self) -> trimesh.Trimesh:
         final_mesh = self._place_board(self._board_pattern)
 
-        for track in self._tracks:
-            final_mesh = self._place_track(track, final_mesh)
-
-        for pin in self._pins:
-            final_mesh = self._place_pin(pin, final_mesh)
+        primitive_meshes = [mesh for track in self._tracks for mesh in self._create_track_meshes(track)]
+        primitive_meshes += [self._create_pin_mesh(pin) for pin in self._pins]
+        if len(primitive_meshes) == 0:
+            return final_mesh
 
-        return final_mesh
+        return union_components([final_mesh, *primitive_meshes])
 
     def _place_board(self, board: BoardPattern) -> trimesh.Trimesh:
         width = board.x_indent*2 + board.x_count*self._step
@@ -262,24 +511,38 @@ class ReliefBoardPatternMeshBuilder:
         return final_mesh
 
     def _place_pin(self, pin: Pin, final_mesh: trimesh.Trimesh) -> trimesh.Trimesh:
+        return boolean_union(final_mesh, self._create_pin_mesh(pin))
+
+    def _create_pin_mesh(self, pin: Pin) -> trimesh.Trimesh:
         center_x = pin.x*self._step + self._step/2
         center_y = pin.y*self._step + self._step/2
 
-        pin = trimesh.creation.cylinder(radius=pin.radius, height=self._base_thickness + self._relief_thickness, sections=CYLINDER_SECTIONS)
+        pin = create_cylinder(pin.radius, self._base_thickness + self._relief_thickness, CYLINDER_SECTIONS)
         move_to_bound(pin, z=1)
         pin.apply_translation([center_x, center_y, 0])
 
-        final_mesh = final_mesh.union(pin)
-        return final_mesh
-
+        return pin
 
     def _place_track(self, track: Track, final_mesh: trimesh.Trimesh) -> trimesh.Trimesh:
+        for mesh in self._create_track_meshes(track):
+            final_mesh = boolean_union(final_mesh, mesh)
+        return final_mesh
+
+    def _create_track_meshes(self, track: Track) -> List[trimesh.Trimesh]:
         start_x = track.x*self._step + self._step/2
         start_y = track.y*self._step + self._step/2
 
         end_x = (track.x + track.x_count)*self._step + self._step/2
         end_y = (track.y + track.y_count)*self._step + self._step/2
 
+        cylinder_mesh = create_cylinder(track.width/2, self._base_thickness + self._relief_thickness, CYLINDER_SECTIONS)
+        move_to_bound(cylinder_mesh, z=1)
+        cylinder_mesh.apply_translation([start_x, start_y, 0])
+
+        # A zero-length track is only its start disc, there is nothing to sweep
+        if track.x_count == 0 and track.y_count == 0:
+            return [cylinder_mesh]
+
         # Create a line segment for the track path
         track_line = trimesh.load_path([
             [start_x, start_y, 0],
@@ -306,13 +569,294 @@ class ReliefBoardPatternMeshBuilder:
 
         move_to_bound(track_mesh, z=1)
 
-        # Subtract the track from the board
-        final_mesh = final_mesh.union(track_mesh)
+        return [track_mesh, cylinder_mesh]
 
-        cylinder_mesh = trimesh.creation.cylinder(radius=track.width/2, height=self._base_thickness + self._relief_thickness, sections=CYLINDER_SECTIONS)
-        move_to_bound(cylinder_mesh, z=1)
-        cylinder_mesh.apply_translation([start_x, start_y, 0])
 
-        final_mesh = final_mesh.union(cylinder_mesh)
+class ExtrudedReliefBoardPatternMeshBuilder(ReliefBoardPatternMeshBuilder):
+    """
+    Builds the same relief as ReliefBoardPatternMeshBuilder in a single pass.
+
+    All tracks and pins are merged into one 2D geometry with shapely, extruded once
+    and united with the base slab by a single boolean operation.
+    """
+
+    def build(self) -> trimesh.Trimesh:
+        final_mesh = self._place_board(self._board_pattern)
+
+        # Zero-width tracks and zero-radius pins add no area, so check the geometry rather than the primitives
+        pattern_geometry = create_pattern_geometry(self._board_pattern, self._step)
+        if pattern_geometry.is_empty or pattern_geometry.area <= 0:
+            return final_mesh
+
+        relief_mesh = extrude_geometry(pattern_geometry, self._base_thickness + self._relief_thickness)
+
+        return boolean_union(final_mesh, relief_mesh)
+
+
+class IncrementalReliefBoardPatternMeshBuilder(ReliefBoardPatternMeshBuilder):
+    """
+    Builds the same relief as ReliefBoardPatternMeshBuilder region by region.
+
+    The board is split into square regions of region_size cells. The mesh of every region is cached
+    under a hash of the primitives touching it, so after an edit only the changed regions are rebuilt.
+    Pass the same MeshCache to the builder of the edited pattern to reuse the unchanged regions.
+
+    Every region is a boolean-free stepped prism with walls only on the board outline. Neighbour regions
+    get the same points on their shared border, so their merged concatenation is one closed body.
+    """
+    _region_size: int
+    _memory_cache: MeshCache
+    _built_regions_count: int
+
+    _TOUCH_TOLERANCE = 1e-6  # в мм
+
+    def __init__(
+        self,
+        step: float,
+        board_pattern: BoardPattern,
+        base_thickness: float = 1.0,
+        relief_thickness: float = 1.0,
+        region_size: int = 4,
+        memory_cache: Optional[MeshCache] = None,
+    ):
+        if region_size < 1:
+            raise ValueError(f"region_size must be at least 1, got {region_size}")
+
+        super().__init__(step, board_pattern, base_thickness, relief_thickness)
+        self._region_size = region_size
+        self._memory_cache = memory_cache if memory_cache is not None else MeshCache(CACHE_MAX_BYTES)
+        self._built_regions_count = 0
 
+    @property
+    def memory_cache(self) -> MeshCache:
+        return self._memory_cache
+
+    @property
+    def built_regions_count(self) -> int:
+        # Regions built by the last build() call, the rest came from the cache
+        return self._built_regions_count
+
+    def build(self) -> trimesh.Trimesh:
+        pins = as_pin_array(self._pins)
+        tracks = as_track_array(self._tracks)
+        polygons = np.concatenate([create_pin_polygons(pins, self._step), create_track_polygons(tracks, self._step)])
+        primitives = np.concatenate([
+            np.column_stack([np.zeros(len(pins)), pins.data['x'], pins.data['y'], np.zeros((len(pins), 2)), pins.data['radius']]),
+            np.column_stack([np.ones(len(tracks)), tracks.data['x'], tracks.data['y'], tracks.data['x_count'], tracks.data['y_count'], tracks.data['width']]),
+        ]).reshape(-1, 6)
+
+        # Primitives on the grid often touch each other in a single point or along a segment, which
+        # would leave non-manifold edges. Growing them by a negligible distance makes them overlap instead.
+        # Regions are queried with the grown primitives, so both regions of a border see the same ones.
+        polygons = shapely.buffer(polygons, self._TOUCH_TOLERANCE, join_style='mitre')
+        tree = shapely.STRtree(polygons)
+        board_bounds = self._get_board_bounds()
+
+        self._built_regions_count = 0
+        region_meshes = []
+        for region in self._get_regions():
+            indexes = np.sort(tree.query(shapely.box(*region), predicate='intersects'))
+            key = self._get_region_key(region, board_bounds, primitives[indexes])
+
+            mesh = self._memory_cache.get(key)
+            if mesh is None:
+                mesh = self._build_region(region, board_bounds, polygons[indexes])
+                self._memory_cache.put(key, mesh)
+                self._built_regions_count += 1
+            region_meshes.append(mesh)
+
+        # Neighbour regions have bitwise equal vertices on their shared borders
+        final_mesh = trimesh.util.concatenate(region_meshes)
+        final_mesh.merge_vertices()
         return final_mesh
+
+    def _get_board_bounds(self) -> Tuple[float, float, float, float]:
+        board = self._board_pattern
+        return (
+            -board.x_indent,
+            -board.y_indent,
+            board.x_count*self._step + board.x_indent,
+            board.y_count*self._step + board.y_indent,
+        )
+
+    def _get_regions(self) -> List[Tuple[float, float, float, float]]:
+        board = self._board_pattern
+
+        def get_bounds(count: int, indent: float) -> List[float]:
+            bounds = [i*self._step for i in range(0, count, self._region_size)] + [count*self._step]
+            bounds[0] -= indent
+            bounds[-1] += indent
+            return bounds
+
+        x_bounds = get_bounds(board.x_count, board.x_indent)
+        y_bounds = get_bounds(board.y_count, board.y_indent)
+
+        return [
+            (min_x, min_y, max_x, max_y)
+            for min_x, max_x in zip(x_bounds[:-1], x_bounds[1:])
+            for min_y, max_y in zip(y_bounds[:-1], y_bounds[1:])
+        ]
+
+    def _get_region_key(self, region: Tuple[float, float, float, float], board_bounds: Tuple[float, float, float, float], primitives: np.ndarray) -> str:
+        # Board bounds decide which region sides get outer walls
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.array([*region, *board_bounds, self._step, self._base_thickness, self._relief_thickness], dtype=np.float64).tobytes())
+        digest.update(np.ascontiguousarray(primitives, dtype=np.float64).tobytes())
+        return f'{self.__class__.__name__}_{digest.hexdigest()}'
+
+    def _build_region(self, region: Tuple[float, float, float, float], board_bounds: Tuple[float, float, float, float], polygons: np.ndarray) -> trimesh.Trimesh:
+        height = self._base_thickness + self._relief_thickness
+        region_geometry = shapely.box(*region)
+
+        # Every primitive is clipped on its own: the neighbour region clips it against the same border line
+        # and gets bitwise equal points there, a clipped union would not
+        clipped_polygons = shapely.clip_by_rect(polygons, *region)
+        borders = _get_inner_borders(region, board_bounds, clipped_polygons)
+        relief_geometry = shapely.unary_union(clipped_polygons[shapely.area(clipped_polygons) > 0])
+
+        # Drops near-duplicate points left by the union, the base is computed afterwards
+        # so that it shares all its inner points with the relief
+        relief_geometry = shapely.remove_repeated_points(shapely.simplify(relief_geometry, 1e-9), 1e-9)
+        # The union may node crossings a few ulps off the region sides
+        relief_geometry = shapely.transform(relief_geometry, lambda coords: _snap_to_bounds(coords, region))
+        base_geometry = region_geometry.difference(relief_geometry)
+
+        region_bounds = region_geometry.bounds
+
+        vertices = []
+        faces = []
+
+        def add_faces(face_vertices: np.ndarray, face_indexes: np.ndarray) -> None:
+            faces.append(face_indexes + sum(len(v) for v in vertices))
+            vertices.append(face_vertices)
+
+        for geometry, top in ((relief_geometry, height), (base_geometry, self._base_thickness)):
+            for polygon in shapely.get_parts(geometry):
+                if not isinstance(polygon, shapely.Polygon) or polygon.is_empty:
+                    continue
+                polygon = _insert_border_points(shapely.geometry.polygon.orient(polygon, 1.0), borders)
+
+                cap_vertices, cap_faces = trimesh.creation.triangulate_polygon(polygon, engine='manifold')
+                cap_faces = orient_faces_ccw(cap_vertices, cap_faces)
+                add_faces(np.column_stack([cap_vertices, np.full(len(cap_vertices), top)]), cap_faces)
+                add_faces(np.column_stack([cap_vertices, np.zeros(len(cap_vertices))]), cap_faces[:, ::-1])
+
+                for ring in [polygon.exterior, *polygon.interiors]:
+                    for start, end in zip(ring.coords[:-1], ring.coords[1:]):
+                        if _is_on_bounds(start, end, board_bounds):
+                            # Outer walls of the relief are split at the base level to match the base walls
+                            levels = [0, self._base_thickness, top] if top > self._base_thickness else [0, top]
+                        elif _is_on_bounds(start, end, region_bounds):
+                            # The neighbour region continues the solid behind an inner border
+                            continue
+                        elif top == self._base_thickness:
+                            # Walls between the base and the relief belong to the relief
+                            continue
+                        else:
+                            levels = [self._base_thickness, top]
+
+                        for bottom_z, top_z in zip(levels[:-1], levels[1:]):
+                            add_faces(np.array([
+                                [start[0], start[1], bottom_z],
+                                [end[0], end[1], bottom_z],
+                                [end[0], end[1], top_z],
+                                [start[0], start[1], top_z],
+                            ]), np.array([[0, 1, 2], [0, 2, 3]]))
+
+        mesh = trimesh.Trimesh(vertices=np.concatenate(vertices), faces=np.concatenate(faces))
+        mesh.merge_vertices()
+        return mesh
+
+
+def _get_inner_borders(
+    region: Tuple[float, float, float, float],
+    board_bounds: Tuple[float, float, float, float],
+    clipped_polygons: np.ndarray,
+) -> List[Tuple[int, float, Tuple[float, float], np.ndarray]]:
+    # Region sides inside the board as (axis, coordinate, side ends, sorted points along the side) with every
+    # point the clipped primitives have on the side. Clipping on each side of a border may differ in the last
+    # bits, so the points are snapped to values both neighbour regions agree on.
+    min_x, min_y, max_x, max_y = region
+    coordinates = shapely.get_coordinates(clipped_polygons)
+
+    borders = []
+    for axis, value, board_value, side_start, side_end in (
+        (0, min_x, board_bounds[0], min_y, max_y),
+        (0, max_x, board_bounds[2], min_y, max_y),
+        (1, min_y, board_bounds[1], min_x, max_x),
+        (1, max_y, board_bounds[3], min_x, max_x),
+    ):
+        if value == board_value:
+            continue
+        points = coordinates[coordinates[:, axis] == value, 1 - axis]
+        points = _snap_border_points(points, side_start, side_end)
+        borders.append((axis, value, (side_start, side_end), np.unique(np.concatenate([points, [side_start, side_end]]))))
+
+    return borders
+
+
+def _insert_border_points(polygon: shapely.Polygon, borders: List[Tuple[int, float, Tuple[float, float], np.ndarray]]) -> shapely.Polygon:
+    # Ring edges lying on an inner border get all border points between their ends, so the caps
+    # of both regions have the same vertices along the border and no T-junctions
+    def insert(ring: shapely.LinearRing) -> List[Tuple[float, float]]:
+        coords = np.array(ring.coords)
+        for axis, value, side_ends, _ in borders:
+            on_border = coords[:, axis] == value
+            coords[on_border, 1 - axis] = _snap_border_points(coords[on_border, 1 - axis], *side_ends)
+        coords = [tuple(point) for point in coords]
+
+        result = [coords[0]]
+        for start, end in zip(coords[:-1], coords[1:]):
+            if start == end:
+                continue
+            for axis, value, _, points in borders:
+                if start[axis] == end[axis] == value:
+                    low, high = sorted((start[1 - axis], end[1 - axis]))
+                    inner = points[(points > low) & (points < high)]
+                    if start[1 - axis] > end[1 - axis]:
+                        inner = inner[::-1]
+                    result.extend((value, point) if axis == 0 else (point, value) for point in inner)
+                    break
+            result.append(end)
+        return result
+
+    return shapely.Polygon(insert(polygon.exterior), [insert(interior) for interior in polygon.interiors])
+
+
+def _snap_to_bounds(coords: np.ndarray, bounds: Tuple[float, float, float, float]) -> np.ndarray:
+    for axis, value in ((0, bounds[0]), (1, bounds[1]), (0, bounds[2]), (1, bounds[3])):
+        coords[np.isclose(coords[:, axis], value, rtol=0, atol=1e-9), axis] = value
+    return coords
+
+
+def _snap_border_points(points: np.ndarray, side_start: float, side_end: float) -> np.ndarray:
+    # Snaps to a grid finer than the touch tolerance, keeping the side ends exact
+    points = np.round(points, 9)
+    points[np.isclose(points, side_start, rtol=0, atol=1e-9)] = side_start
+    points[np.isclose(points, side_end, rtol=0, atol=1e-9)] = side_end
+    return points
+
+
+def _is_on_bounds(start: Tuple[float, float], end: Tuple[float, float], bounds: Tuple[float, float, float, float]) -> bool:
+    min_x, min_y, max_x, max_y = bounds
+    return (
+        start[0] == end[0] == min_x or start[0] == end[0] == max_x or
+        start[1] == end[1] == min_y or start[1] == end[1] == max_y
+    )
+
+
+class ExtrudedBoardPatternMeshBuilder(BoardPatternMeshBuilder):
+    """
+    Builds the same engraved board as BoardPatternMeshBuilder without boolean operations.
+
+    The whole cut-out is computed as one shapely geometry, subtracted from the board
+    outline in 2D and the result is extruded once.
+    """
+
+    def build(self) -> trimesh.Trimesh:
+        board_geometry = create_board_polygon(self._board_pattern, self._step)
+
+        if len(self._tracks) > 0 or len(self._pins) > 0:
+            board_geometry = board_geometry.difference(create_pattern_geometry(self._board_pattern, self._step))
+
+        return extrude_geometry(board_geometry, self._thickness)
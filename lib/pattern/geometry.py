@@ -0,0 +1,98 @@
+from typing import Tuple, List, Union
+
+import numpy as np
+import shapely
+
+from lib.constants import CYLINDER_SECTIONS
+from lib.pattern.structs import BoardPattern, Pin, Track, PinArray, TrackArray, as_pin_array, as_track_array
+
+
+def get_pin_center(pin: Pin, step: float) -> Tuple[float, float]:
+    return pin.x*step + step/2, pin.y*step + step/2
+
+
+def get_track_ends(track: Track, step: float) -> Tuple[Tuple[float, float], Tuple[float, float]]:
+    start_x = track.x*step + step/2
+    start_y = track.y*step + step/2
+
+    end_x = (track.x + track.x_count)*step + step/2
+    end_y = (track.y + track.y_count)*step + step/2
+
+    return (start_x, start_y), (end_x, end_y)
+
+
+def get_pin_centers(pins: Union[List[Pin], PinArray], step: float) -> np.ndarray:
+    """
+    Vectorized get_pin_center(), returns an (n, 2) array.
+    """
+    data = as_pin_array(pins).data
+    return np.column_stack([data['x'], data['y']])*step + step/2
+
+
+def get_tracks_ends(tracks: Union[List[Track], TrackArray], step: float) -> np.ndarray:
+    """
+    Vectorized get_track_ends(), returns an (n, 2, 2) array of start and end points.
+    """
+    data = as_track_array(tracks).data
+    starts = np.column_stack([data['x'], data['y']])
+    ends = starts + np.column_stack([data['x_count'], data['y_count']])
+    return np.stack([starts, ends], axis=1)*step + step/2
+
+
+def create_pin_polygon(pin: Pin, step: float) -> shapely.Polygon:
+    return shapely.Point(*get_pin_center(pin, step)).buffer(pin.radius, quad_segs=CYLINDER_SECTIONS//4)
+
+
+def create_track_polygon(track: Track, step: float) -> shapely.Polygon:
+    start, end = get_track_ends(track, step)
+
+    # Same shape as the mesh builders produce: a flat-capped segment plus a disc at its start
+    start_polygon = shapely.Point(*start).buffer(track.width/2, quad_segs=CYLINDER_SECTIONS//4)
+    if start == end:
+        return start_polygon
+
+    segment_polygon = shapely.LineString([start, end]).buffer(track.width/2, cap_style='flat')
+    return shapely.union(segment_polygon, start_polygon)
+
+
+def create_pin_polygons(pins: Union[List[Pin], PinArray], step: float) -> np.ndarray:
+    """
+    Vectorized create_pin_polygon() for many pins at once.
+    """
+    pins = as_pin_array(pins)
+    return shapely.buffer(shapely.points(get_pin_centers(pins, step)), pins.data['radius'], quad_segs=CYLINDER_SECTIONS//4)
+
+
+def create_track_polygons(tracks: Union[List[Track], TrackArray], step: float) -> np.ndarray:
+    """
+    Vectorized create_track_polygon() for many tracks at once.
+    """
+    tracks = as_track_array(tracks)
+    ends = get_tracks_ends(tracks, step)
+    radii = tracks.data['width']/2
+
+    start_polygons = shapely.buffer(shapely.points(ends[:, 0]), radii, quad_segs=CYLINDER_SECTIONS//4)
+
+    # Zero-length tracks are just their start disc
+    has_segment = np.any(ends[:, 0] != ends[:, 1], axis=1)
+    segment_polygons = shapely.buffer(shapely.linestrings(ends[has_segment]), radii[has_segment], cap_style='flat')
+
+    polygons = start_polygons.copy()
+    polygons[has_segment] = shapely.union(segment_polygons, start_polygons[has_segment])
+    return polygons
+
+
+def create_pattern_geometry(board_pattern: BoardPattern, step: float) -> shapely.Geometry:
+    return shapely.unary_union(np.concatenate([
+        create_track_polygons(board_pattern.tracks, step),
+        create_pin_polygons(board_pattern.pins, step),
+    ]))
+
+
+def create_board_polygon(board_pattern: BoardPattern, step: float) -> shapely.Polygon:
+    return shapely.box(
+        -board_pattern.x_indent,
+        -board_pattern.y_indent,
+        board_pattern.x_count*step + board_pattern.x_indent,
+        board_pattern.y_count*step + board_pattern.y_indent,
+    )
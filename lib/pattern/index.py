@@ -0,0 +1,105 @@
+import math
+from collections import defaultdict
+from typing import List, Tuple, Dict, Iterator, Union, Optional
+
+import numpy as np
+import shapely
+
+from lib.pattern.geometry import create_pin_polygons, create_track_polygons
+from lib.pattern.structs import BoardPattern, Pin, Track
+
+Cell = Tuple[int, int]
+
+
+def iter_track_cells(track: Track) -> Iterator[Cell]:
+    # Grid nodes the track centerline passes through, tracks always start and end on a node
+    nodes_count = math.gcd(abs(track.x_count), abs(track.y_count))
+    if nodes_count == 0:
+        yield track.x, track.y
+        return
+
+    x_step = track.x_count // nodes_count
+    y_step = track.y_count // nodes_count
+    for i in range(nodes_count + 1):
+        yield track.x + i*x_step, track.y + i*y_step
+
+
+class IndexedBoardPattern(BoardPattern):
+    """
+    BoardPattern with spatial indexes over its primitives.
+
+    Cells are indexed with a hash of the grid nodes each primitive passes through, geometric
+    extents (in mm, pattern coordinates without the board indent) with an STRtree.
+    The indexes are built once, so pins and tracks must not be changed afterwards.
+    """
+    _step: float  # в мм
+    _pin_cells: Dict[Cell, List[Pin]]
+    _track_cells: Dict[Cell, List[Track]]
+    _tree: shapely.STRtree
+
+    def __init__(self, x_count: int, y_count: int, x_indent: float, y_indent: float, pins: List[Pin], tracks: List[Track], step: float):
+        super().__init__(x_count, y_count, x_indent, y_indent, pins, tracks)
+        self._step = step
+
+        self._pin_cells = defaultdict(list)
+        for pin in pins:
+            self._pin_cells[(pin.x, pin.y)].append(pin)
+
+        self._track_cells = defaultdict(list)
+        for track in tracks:
+            for cell in iter_track_cells(track):
+                self._track_cells[cell].append(track)
+
+        self._tree = shapely.STRtree(np.concatenate([
+            create_pin_polygons(pins, step),
+            create_track_polygons(tracks, step),
+        ]))
+
+    @classmethod
+    def from_pattern(cls, board_pattern: BoardPattern, step: float) -> "IndexedBoardPattern":
+        return cls(
+            board_pattern.x_count,
+            board_pattern.y_count,
+            board_pattern.x_indent,
+            board_pattern.y_indent,
+            board_pattern.pins,
+            board_pattern.tracks,
+            step,
+        )
+
+    @property
+    def step(self) -> float:
+        return self._step
+
+    def query_cell(self, x: int, y: int) -> Tuple[List[Pin], List[Track]]:
+        return list(self._pin_cells.get((x, y), [])), list(self._track_cells.get((x, y), []))
+
+    def query_rect(self, min_x: float, min_y: float, max_x: float, max_y: float) -> Tuple[List[Pin], List[Track]]:
+        indexes = self._tree.query(shapely.box(min_x, min_y, max_x, max_y), predicate='intersects')
+        return self._split(sorted(indexes))
+
+    def query_nearest(self, x: float, y: float, max_distance: Optional[float] = None) -> Tuple[List[Pin], List[Track]]:
+        """
+        Returns the primitives closest to the point, several if they are at the same distance.
+        """
+        if len(self._tree) == 0:
+            return [], []
+
+        indexes = self._tree.query_nearest(shapely.Point(x, y), max_distance=max_distance, all_matches=True)
+        return self._split(sorted(indexes))
+
+    def _split(self, indexes) -> Tuple[List[Pin], List[Track]]:
+        pins = []
+        tracks = []
+        for i in indexes:
+            primitive = self._get_primitive(int(i))
+            if isinstance(primitive, Pin):
+                pins.append(primitive)
+            else:
+                tracks.append(primitive)
+        return pins, tracks
+
+    def _get_primitive(self, index: int) -> Union[Pin, Track]:
+        if index < len(self.pins):
+            return self.pins[index]
+        return self.tracks[index - len(self.pins)]
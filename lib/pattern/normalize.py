@@ -0,0 +1,164 @@
+import math
+from collections import defaultdict
+from typing import List, Tuple, Dict, Set, Union
+
+from lib.pattern.structs import BoardPattern, Pin, Track, TrackArray, Polyline
+
+Point = Tuple[int, int]
+
+
+def _get_line_key(track: Track) -> Tuple[float, Point, int]:
+    # Tracks of the same width lying on the same grid line share the key: (width, primitive direction, line offset)
+    nodes_count = math.gcd(abs(track.x_count), abs(track.y_count))
+    dx = track.x_count // nodes_count
+    dy = track.y_count // nodes_count
+    if dx < 0 or (dx == 0 and dy < 0):
+        dx, dy = -dx, -dy
+
+    return track.width, (dx, dy), track.x*dy - track.y*dx
+
+
+def _merge_line(tracks: List[Track], direction: Point, step: float) -> List[Track]:
+    dx, dy = direction
+    length_sq = dx*dx + dy*dy
+    base = (tracks[0].x, tracks[0].y)
+    width = tracks[0].width
+
+    def to_param(x: int, y: int) -> int:
+        return ((x - base[0])*dx + (y - base[1])*dy) // length_sq
+
+    def to_point(t: int) -> Point:
+        return base[0] + t*dx, base[1] + t*dy
+
+    intervals = []
+    starts = set()
+    for track in tracks:
+        start = to_param(track.x, track.y)
+        end = to_param(track.x + track.x_count, track.y + track.y_count)
+        intervals.append((min(start, end), max(start, end)))
+        starts.add(start)
+
+    intervals.sort()
+    merged = [list(intervals[0])]
+    for start, end in intervals[1:]:
+        if start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    # Every track has a disc at its start, a merged track keeps only one at its own start.
+    # The others are hidden inside the segment, unless they are closer than half the width to a flat end.
+    step_length = math.sqrt(length_sq)*step
+    result = []
+    for start, end in merged:
+        line_starts = sorted(t for t in starts if start <= t <= end)
+        if start in starts:
+            first, last = start, end
+        elif end in starts:
+            first, last = end, start
+        else:
+            # Can't be expressed by a single track without adding a disc at one of the ends
+            result.extend(
+                track for track in tracks
+                if start <= to_param(track.x, track.y) <= end
+            )
+            continue
+
+        first_x, first_y = to_point(first)
+        last_x, last_y = to_point(last)
+        result.append(Track(first_x, first_y, last_x - first_x, last_y - first_y, width))
+
+        for t in line_starts:
+            if t != first and abs(t - last)*step_length < width/2:
+                x, y = to_point(t)
+                result.append(Track(x, y, 0, 0, width))
+
+    return result
+
+
+def normalize_tracks(tracks: Union[List[Track], TrackArray], step: float) -> List[Track]:
+    """
+    Merges overlapping and adjoining colinear tracks of the same width and removes duplicates.
+
+    The result covers exactly the same area in the mesh builders, where a track is a flat-capped
+    segment with a disc at its start, and in the image builders, which round both ends.
+    A start disc that the merged segment doesn't cover is kept as a zero-length track,
+    all pattern builders draw it as a disc.
+    """
+    lines: Dict[Tuple[float, Point, int], List[Track]] = defaultdict(list)
+    discs: Set[Tuple[int, int, float]] = set()
+    result = []
+
+    for track in tracks:
+        if track.x_count == 0 and track.y_count == 0:
+            disc = (track.x, track.y, track.width)
+            if disc not in discs:
+                discs.add(disc)
+                result.append(Track(track.x, track.y, 0, 0, track.width))
+            continue
+        lines[_get_line_key(track)].append(track)
+
+    for (_, direction, _), line_tracks in lines.items():
+        result.extend(_merge_line(line_tracks, direction, step))
+
+    return result
+
+
+def normalize_pins(pins: List[Pin]) -> List[Pin]:
+    # Of the pins in the same cell only the largest one is visible
+    largest: Dict[Point, Pin] = {}
+    for pin in pins:
+        if (pin.x, pin.y) not in largest or pin.radius > largest[(pin.x, pin.y)].radius:
+            largest[(pin.x, pin.y)] = pin
+    return [Pin(pin.x, pin.y, pin.radius) for pin in largest.values()]
+
+
+def normalize_board_pattern(board_pattern: BoardPattern, step: float) -> BoardPattern:
+    return BoardPattern(
+        x_count=board_pattern.x_count,
+        y_count=board_pattern.y_count,
+        x_indent=board_pattern.x_indent,
+        y_indent=board_pattern.y_indent,
+        pins=normalize_pins(board_pattern.pins),
+        tracks=normalize_tracks(board_pattern.tracks, step),
+    )
+
+
+def create_polylines(tracks: Union[List[Track], TrackArray]) -> List[Polyline]:
+    """
+    Chains tracks of the same width where one ends and the next one starts.
+
+    Polylines are meant for outputs with round joins and caps (SVG, Gerber), where a chain
+    looks the same as its separate tracks.
+    """
+    outgoing: Dict[Tuple[Point, float], List[int]] = defaultdict(list)
+    incoming: Dict[Tuple[Point, float], int] = defaultdict(int)
+    for i, track in enumerate(tracks):
+        outgoing[((track.x, track.y), track.width)].append(i)
+        incoming[((track.x + track.x_count, track.y + track.y_count), track.width)] += 1
+
+    used = [False]*len(tracks)
+    polylines = []
+
+    # Start chains where nothing leads in first, so that open paths are not split in the middle
+    order = sorted(range(len(tracks)), key=lambda i: incoming[((tracks[i].x, tracks[i].y), tracks[i].width)] > 0)
+    for i in order:
+        if used[i]:
+            continue
+
+        track = tracks[i]
+        points = [(track.x, track.y)]
+        while True:
+            used[i] = True
+            end = (track.x + track.x_count, track.y + track.y_count)
+            points.append(end)
+
+            next_indexes = [j for j in outgoing[(end, track.width)] if not used[j]]
+            if not next_indexes:
+                break
+            i = next_indexes[0]
+            track = tracks[i]
+
+        polylines.append(Polyline(points, track.width))
+
+    return polylines
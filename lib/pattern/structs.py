@@ -1,4 +1,6 @@
-from typing import List
+from typing import List, Iterator, Union, Iterable, Tuple
+
+import numpy as np
 
 
 class Pin:
@@ -27,6 +29,175 @@ class Track:
         self.width = width
 
 
+PIN_DTYPE = np.dtype([('x', '<i8'), ('y', '<i8'), ('radius', '<f8')])
+TRACK_DTYPE = np.dtype([('x', '<i8'), ('y', '<i8'), ('x_count', '<i8'), ('y_count', '<i8'), ('width', '<f8')])
+
+
+class PinView(Pin):
+    """
+    Pin backed by a row of a PinArray, changes are written to the array.
+    """
+    __slots__ = ('_data', '_index')
+
+    def __init__(self, data: np.ndarray, index: int):
+        self._data = data
+        self._index = index
+
+    @property
+    def x(self) -> int:
+        return int(self._data['x'][self._index])
+
+    @x.setter
+    def x(self, value: int):
+        self._data['x'][self._index] = value
+
+    @property
+    def y(self) -> int:
+        return int(self._data['y'][self._index])
+
+    @y.setter
+    def y(self, value: int):
+        self._data['y'][self._index] = value
+
+    @property
+    def radius(self) -> float:
+        return float(self._data['radius'][self._index])
+
+    @radius.setter
+    def radius(self, value: float):
+        self._data['radius'][self._index] = value
+
+
+class TrackView(Track):
+    """
+    Track backed by a row of a TrackArray, changes are written to the array.
+    """
+    __slots__ = ('_data', '_index')
+
+    def __init__(self, data: np.ndarray, index: int):
+        self._data = data
+        self._index = index
+
+    @property
+    def x(self) -> int:
+        return int(self._data['x'][self._index])
+
+    @x.setter
+    def x(self, value: int):
+        self._data['x'][self._index] = value
+
+    @property
+    def y(self) -> int:
+        return int(self._data['y'][self._index])
+
+    @y.setter
+    def y(self, value: int):
+        self._data['y'][self._index] = value
+
+    @property
+    def x_count(self) -> int:
+        return int(self._data['x_count'][self._index])
+
+    @x_count.setter
+    def x_count(self, value: int):
+        self._data['x_count'][self._index] = value
+
+    @property
+    def y_count(self) -> int:
+        return int(self._data['y_count'][self._index])
+
+    @y_count.setter
+    def y_count(self, value: int):
+        self._data['y_count'][self._index] = value
+
+    @property
+    def width(self) -> float:
+        return float(self._data['width'][self._index])
+
+    @width.setter
+    def width(self, value: float):
+        self._data['width'][self._index] = value
+
+
+class PinArray:
+    """
+    Columnar storage of pins in a NumPy structured array with PIN_DTYPE fields.
+
+    It can be used everywhere a list of pins is expected: items are PinView objects over the array rows.
+    """
+    _data: np.ndarray
+
+    def __init__(self, data: np.ndarray):
+        if data.dtype != PIN_DTYPE:
+            raise ValueError(f"Expected dtype {PIN_DTYPE}, got {data.dtype}")
+        self._data = data
+
+    @classmethod
+    def from_pins(cls, pins: Iterable[Pin]) -> "PinArray":
+        return cls(np.array([(pin.x, pin.y, pin.radius) for pin in pins], dtype=PIN_DTYPE))
+
+    @property
+    def data(self) -> np.ndarray:
+        return self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, index: int) -> PinView:
+        if not -len(self._data) <= index < len(self._data):
+            raise IndexError(index)
+        return PinView(self._data, index % len(self._data))
+
+    def __iter__(self) -> Iterator[PinView]:
+        for i in range(len(self._data)):
+            yield PinView(self._data, i)
+
+
+class TrackArray:
+    """
+    Columnar storage of tracks in a NumPy structured array with TRACK_DTYPE fields.
+
+    It can be used everywhere a list of tracks is expected: items are TrackView objects over the array rows.
+    """
+    _data: np.ndarray
+
+    def __init__(self, data: np.ndarray):
+        if data.dtype != TRACK_DTYPE:
+            raise ValueError(f"Expected dtype {TRACK_DTYPE}, got {data.dtype}")
+        self._data = data
+
+    @classmethod
+    def from_tracks(cls, tracks: Iterable[Track]) -> "TrackArray":
+        return cls(np.array([
+            (track.x, track.y, track.x_count, track.y_count, track.width)
+            for track in tracks
+        ], dtype=TRACK_DTYPE))
+
+    @property
+    def data(self) -> np.ndarray:
+        return self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, index: int) -> TrackView:
+        if not -len(self._data) <= index < len(self._data):
+            raise IndexError(index)
+        return TrackView(self._data, index % len(self._data))
+
+    def __iter__(self) -> Iterator[TrackView]:
+        for i in range(len(self._data)):
+            yield TrackView(self._data, i)
+
+
+def as_pin_array(pins: Union[List[Pin], PinArray]) -> PinArray:
+    return pins if isinstance(pins, PinArray) else PinArray.from_pins(pins)
+
+
+def as_track_array(tracks: Union[List[Track], TrackArray]) -> TrackArray:
+    return tracks if isinstance(tracks, TrackArray) else TrackArray.from_tracks(tracks)
+
+
 class MultiTrack:
     _x_start: int
     _y_start: int
@@ -58,16 +229,33 @@ class MultiTrack:
         return list(self._tracks)
 
 
+class Polyline:
+    points: List[Tuple[int, int]]
+    width: float
+
+    def __init__(self, points: List[Tuple[int, int]], width: float):
+        self.points = points
+        self.width = width
+
+
 class BoardPattern:
     x_count: int
     y_count: int
     x_indent: float
     y_indent: float
 
-    pins: List[Pin]
-    tracks: List[Track]
+    pins: Union[List[Pin], PinArray]
+    tracks: Union[List[Track], TrackArray]
 
-    def __init__(self, x_count: int, y_count: int, x_indent: float, y_indent: float, pins: List[Pin], tracks: List[Track]):
+    def __init__(
+        self,
+        x_count: int,
+        y_count: int,
+        x_indent: float,
+        y_indent: float,
+        pins: Union[List[Pin], PinArray],
+        tracks: Union[List[Track], TrackArray],
+    ):
         self.x_count = x_count
         self.y_count = y_count
         self.x_indent = x_indent
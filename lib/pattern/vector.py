@@ -0,0 +1,183 @@
+import abc
+from typing import List, Tuple, Dict, Optional
+
+from lib.pattern.geometry import get_pin_center, get_track_ends
+from lib.pattern.normalize import create_polylines
+from lib.pattern.structs import BoardPattern, Pin, Track
+
+
+def _format_mm(value: float, decimals: int = 4) -> str:
+    return f'{value:.{decimals}f}'.rstrip('0').rstrip('.')
+
+
+class BaseBoardPatternVectorBuilder(abc.ABC):
+    """
+    Coordinates are in mm from the top left corner of the board, the same as in BoardPatternImageBuilder.
+    """
+    _step: float  # в мм
+    _board_pattern: BoardPattern
+    _pins: List[Pin]
+    _tracks: List[Track]
+
+    def __init__(self, step: float, board_pattern: BoardPattern):
+        self._step = step
+        self._board_pattern = board_pattern
+        self._pins = board_pattern.pins
+        self._tracks = board_pattern.tracks
+
+    def _get_size(self) -> Tuple[float, float]:
+        width = self._board_pattern.x_indent * 2 + self._board_pattern.x_count * self._step
+        height = self._board_pattern.y_indent * 2 + self._board_pattern.y_count * self._step
+        return width, height
+
+    def _get_pin_center(self, pin: Pin) -> Tuple[float, float]:
+        x, y = get_pin_center(pin, self._step)
+        return self._board_pattern.x_indent + x, self._board_pattern.y_indent + y
+
+    def _get_track_ends(self, track: Track) -> Tuple[Tuple[float, float], Tuple[float, float]]:
+        (start_x, start_y), (end_x, end_y) = get_track_ends(track, self._step)
+        x_indent = self._board_pattern.x_indent
+        y_indent = self._board_pattern.y_indent
+        return (x_indent + start_x, y_indent + start_y), (x_indent + end_x, y_indent + end_y)
+
+    def _get_node_position(self, x: int, y: int) -> Tuple[float, float]:
+        return self._get_pin_center(Pin(x, y, 0))
+
+    @abc.abstractmethod
+    def build(self) -> str:
+        raise NotImplementedError()
+
+    def save(self, file_path: str) -> None:
+        with open(file_path, 'w', encoding='ascii') as file:
+            file.write(self.build())
+
+
+class BoardPatternSvgBuilder(BaseBoardPatternVectorBuilder):
+    """
+    Tracks are chained into round-capped stroked polylines and pins are circles, the document size is set in mm.
+    """
+    _draw_board: bool
+    _draw_grid: bool
+
+    def __init__(self, step: float, board_pattern: BoardPattern, draw_board: bool = True, draw_grid: bool = True):
+        super().__init__(step, board_pattern)
+        self._draw_board = draw_board
+        self._draw_grid = draw_grid
+
+    def build(self) -> str:
+        width, height = self._get_size()
+
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{_format_mm(width)}mm" height="{_format_mm(height)}mm" '
+            f'viewBox="0 0 {_format_mm(width)} {_format_mm(height)}">',
+            f'<rect width="{_format_mm(width)}" height="{_format_mm(height)}" fill="white"/>',
+        ]
+
+        if self._draw_board:
+            lines.extend(self._create_board_elements(width, height))
+
+        lines.append('<g stroke="black" stroke-linecap="round" stroke-linejoin="round" fill="none">')
+        for polyline in create_polylines(self._tracks):
+            points = ' '.join(
+                f'{_format_mm(x)},{_format_mm(y)}'
+                for x, y in (self._get_node_position(x, y) for x, y in polyline.points)
+            )
+            lines.append(f'<polyline points="{points}" stroke-width="{_format_mm(polyline.width)}"/>')
+        lines.append('</g>')
+
+        lines.append('<g fill="black">')
+        for pin in self._pins:
+            center_x, center_y = self._get_pin_center(pin)
+            lines.append(f'<circle cx="{_format_mm(center_x)}" cy="{_format_mm(center_y)}" r="{_format_mm(pin.radius)}"/>')
+        lines.append('</g>')
+
+        lines.append('</svg>')
+
+        return '\n'.join(lines) + '\n'
+
+    def _create_board_elements(self, width: float, height: float) -> List[str]:
+        board = self._board_pattern
+        left = board.x_indent
+        top = board.y_indent
+        right = board.x_indent + board.x_count * self._step
+        bottom = board.y_indent + board.y_count * self._step
+
+        lines = []
+
+        if self._draw_grid:
+            lines.append('<g stroke="lightgray" stroke-width="0.05">')
+            for x in range(board.x_count + 1):
+                x_pos = _format_mm(board.x_indent + x * self._step)
+                lines.append(f'<line x1="{x_pos}" y1="{_format_mm(top)}" x2="{x_pos}" y2="{_format_mm(bottom)}"/>')
+            for y in range(board.y_count + 1):
+                y_pos = _format_mm(board.y_indent + y * self._step)
+                lines.append(f'<line x1="{_format_mm(left)}" y1="{y_pos}" x2="{_format_mm(right)}" y2="{y_pos}"/>')
+            lines.append('</g>')
+
+        lines.append(f'<rect width="{_format_mm(width)}" height="{_format_mm(height)}" fill="none" stroke="gray" stroke-width="0.2"/>')
+
+        return lines
+
+
+class BoardPatternGerberBuilder(BaseBoardPatternVectorBuilder):
+    """
+    Minimal RS-274X subset: circular apertures, linear draws for tracks and flashes for pins.
+
+    Gerber Y axis points up, so coordinates are mirrored relative to the image builders.
+    """
+    _DECIMALS = 6
+
+    def build(self) -> str:
+        _, height = self._get_size()
+        apertures = self._create_apertures()
+
+        lines = [
+            f'%FSLAX4{self._DECIMALS}Y4{self._DECIMALS}*%',
+            '%MOMM*%',
+            '%LPD*%',
+        ]
+
+        for diameter, code in apertures.items():
+            lines.append(f'%ADD{code}C,{_format_mm(diameter, self._DECIMALS)}*%')
+
+        lines.append('G01*')
+
+        current_aperture = None
+        current_point = None
+        for track in self._tracks:
+            (start_x, start_y), (end_x, end_y) = self._get_track_ends(track)
+            current_aperture = self._select_aperture(lines, apertures[track.width], current_aperture)
+
+            start = self._format_point(start_x, height - start_y)
+            end = self._format_point(end_x, height - end_y)
+
+            # Consecutive tracks of a MultiTrack continue from the current point without a move
+            if start != current_point:
+                lines.append(f'{start}D02*')
+            lines.append(f'{end}D01*')
+            current_point = end
+
+        for pin in self._pins:
+            center_x, center_y = self._get_pin_center(pin)
+            current_aperture = self._select_aperture(lines, apertures[pin.radius * 2], current_aperture)
+            lines.append(f'{self._format_point(center_x, height - center_y)}D03*')
+
+        lines.append('M02*')
+
+        return '\n'.join(lines) + '\n'
+
+    def _create_apertures(self) -> Dict[float, int]:
+        diameters = sorted({track.width for track in self._tracks} | {pin.radius * 2 for pin in self._pins})
+        # Aperture codes below 10 are reserved
+        return {diameter: 10 + i for i, diameter in enumerate(diameters)}
+
+    @staticmethod
+    def _select_aperture(lines: List[str], aperture: int, current_aperture: Optional[int]) -> int:
+        if aperture != current_aperture:
+            lines.append(f'D{aperture}*')
+        return aperture
+
+    def _format_point(self, x: float, y: float) -> str:
+        scale = 10 ** self._DECIMALS
+        return f'X{round(x * scale)}Y{round(y * scale)}'
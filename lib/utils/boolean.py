@@ -0,0 +1,162 @@
+import threading
+from typing import Dict
+
+import numpy as np
+import trimesh
+
+# Points closer than this to a hull face are considered inside
+_HULL_TOLERANCE = 1e-9
+
+
+class BooleanStats:
+    """
+    Counts boolean operations run by the engine and skipped by the pre-checks, by reason.
+    Thread-safe, unions of union_tree may run in a thread pool.
+    """
+    _lock: threading.Lock
+    _executed: int
+    _skipped: Dict[str, int]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._executed = 0
+            self._skipped = {}
+
+    def add_executed(self) -> None:
+        with self._lock:
+            self._executed += 1
+
+    def add_skipped(self, reason: str) -> None:
+        with self._lock:
+            self._skipped[reason] = self._skipped.get(reason, 0) + 1
+
+    @property
+    def executed(self) -> int:
+        with self._lock:
+            return self._executed
+
+    @property
+    def skipped(self) -> int:
+        with self._lock:
+            return sum(self._skipped.values())
+
+    @property
+    def skipped_by_reason(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._skipped)
+
+
+BOOLEAN_STATS = BooleanStats()
+
+
+def boolean_union(*meshes: trimesh.Trimesh, check_hull: bool = False) -> trimesh.Trimesh:
+    """
+    Same as chained Trimesh.union() calls, but disjoint operands are concatenated
+    and operands contained in the other one are dropped without running the engine.
+
+    Like the engine, it never returns one of the operands itself, only a new mesh.
+    """
+    assert len(meshes) > 0
+    if len(meshes) == 1:
+        return meshes[0].copy()
+
+    result = meshes[0]
+    for mesh in meshes[1:]:
+        result = _union_pair(result, mesh, check_hull)
+    return result
+
+
+def boolean_difference(mesh: trimesh.Trimesh, *others: trimesh.Trimesh, check_hull: bool = False) -> trimesh.Trimesh:
+    """
+    Same as mesh.difference(others), but operands not touching the mesh are dropped
+    and a mesh covered by an operand becomes empty without running the engine.
+    """
+    operands = []
+    for other in others:
+        if _is_separated(mesh, other, check_hull):
+            BOOLEAN_STATS.add_skipped('difference_disjoint')
+            continue
+        if check_hull and _contains(other, mesh):
+            BOOLEAN_STATS.add_skipped('difference_covered')
+            return trimesh.Trimesh()
+        operands.append(other)
+
+    if len(operands) == 0:
+        return mesh.copy()
+
+    BOOLEAN_STATS.add_executed()
+    return mesh.difference(operands if len(operands) > 1 else operands[0])
+
+
+def boolean_intersection(mesh: trimesh.Trimesh, other: trimesh.Trimesh, check_hull: bool = False) -> trimesh.Trimesh:
+    if _is_separated(mesh, other, check_hull):
+        BOOLEAN_STATS.add_skipped('intersection_disjoint')
+        return trimesh.Trimesh()
+
+    if check_hull:
+        if _contains(other, mesh):
+            BOOLEAN_STATS.add_skipped('intersection_contained')
+            return mesh.copy()
+        if _contains(mesh, other):
+            BOOLEAN_STATS.add_skipped('intersection_contained')
+            return other.copy()
+
+    BOOLEAN_STATS.add_executed()
+    return mesh.intersection(other)
+
+
+def _union_pair(mesh: trimesh.Trimesh, other: trimesh.Trimesh, check_hull: bool) -> trimesh.Trimesh:
+    if _is_separated(mesh, other, check_hull):
+        BOOLEAN_STATS.add_skipped('union_disjoint')
+        return trimesh.util.concatenate([mesh, other])
+
+    if check_hull:
+        if _contains(mesh, other):
+            BOOLEAN_STATS.add_skipped('union_contained')
+            return mesh.copy()
+        if _contains(other, mesh):
+            BOOLEAN_STATS.add_skipped('union_contained')
+            return other.copy()
+
+    BOOLEAN_STATS.add_executed()
+    return mesh.union(other)
+
+
+def _is_separated(mesh: trimesh.Trimesh, other: trimesh.Trimesh, check_hull: bool) -> bool:
+    if len(mesh.faces) == 0 or len(other.faces) == 0:
+        return True
+
+    # Touching boxes are not separated: the union still has to merge the shared faces
+    bounds = mesh.bounds
+    other_bounds = other.bounds
+    if np.any(bounds[1] < other_bounds[0]) or np.any(other_bounds[1] < bounds[0]):
+        return True
+
+    if not check_hull:
+        return False
+
+    # Separating axis test over the face normals of both hulls, a found axis proves the meshes are disjoint
+    hull = mesh.convex_hull
+    other_hull = other.convex_hull
+    axes = np.concatenate([hull.face_normals, other_hull.face_normals])
+    projections = hull.vertices @ axes.T
+    other_projections = other_hull.vertices @ axes.T
+    return bool(np.any(
+        (projections.max(axis=0) < other_projections.min(axis=0)) |
+        (other_projections.max(axis=0) < projections.min(axis=0))
+    ))
+
+
+def _contains(mesh: trimesh.Trimesh, other: trimesh.Trimesh) -> bool:
+    # Only a convex mesh is known to contain everything inside its hull
+    if len(other.vertices) == 0 or not mesh.is_convex:
+        return False
+
+    # Signed distances of the other vertices to the planes of all faces
+    offsets = np.einsum('ij,ij->i', mesh.face_normals, mesh.triangles[:, 0, :])
+    distances = other.vertices @ mesh.face_normals.T - offsets
+    return bool(np.all(distances <= _HULL_TOLERANCE))
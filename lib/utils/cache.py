@@ -0,0 +1,106 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import trimesh
+
+
+def get_mesh_size(mesh: trimesh.Trimesh) -> int:
+    return mesh.vertices.nbytes + mesh.faces.nbytes + mesh.visual.face_colors.nbytes
+
+
+class MeshCache:
+    """
+    LRU cache of meshes bounded by the total size of their vertex, face and color buffers.
+
+    Pass the same instance to several build managers to share it between them.
+    Thread-safe: it is shared by the threads of ParallelBuildManager and by the primitive factory.
+    """
+    _lock: threading.RLock
+    _max_bytes: int
+    _items: "OrderedDict[str, trimesh.Trimesh]"
+    _sizes: "OrderedDict[str, int]"
+    _total_bytes: int
+    _hits: int
+    _misses: int
+    _evictions: int
+
+    def __init__(self, max_bytes: int):
+        self._lock = threading.RLock()
+        self._max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._sizes = OrderedDict()
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: str) -> Optional[trimesh.Trimesh]:
+        with self._lock:
+            if key not in self._items:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            self._items.move_to_end(key)
+            self._sizes.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key: str, mesh: trimesh.Trimesh) -> None:
+        size = get_mesh_size(mesh)
+
+        with self._lock:
+            if key in self._items:
+                self._remove(key)
+
+            if size > self._max_bytes:
+                return
+
+            while self._total_bytes + size > self._max_bytes:
+                self._remove(next(iter(self._items)))
+                self._evictions += 1
+
+            self._items[key] = mesh
+            self._sizes[key] = size
+            self._total_bytes += size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def _remove(self, key: str) -> None:
+        del self._items[key]
+        self._total_bytes -= self._sizes.pop(key)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._items
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def evictions(self) -> int:
+        return self._evictions
@@ -0,0 +1,155 @@
+import abc
+import os
+import shutil
+import tempfile
+from typing import BinaryIO
+
+import numpy as np
+import trimesh
+
+_STL_TRIANGLE_DTYPE = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('vertices', '<f4', (3, 3)),
+    ('attributes', '<u2'),
+])
+
+_PLY_VERTEX_DTYPE = np.dtype([('x', '<f4'), ('y', '<f4'), ('z', '<f4')])
+_PLY_FACE_DTYPE = np.dtype([
+    ('count', 'u1'),
+    ('vertex_indices', '<i4', (3,)),
+    ('red', 'u1'),
+    ('green', 'u1'),
+    ('blue', 'u1'),
+    ('alpha', 'u1'),
+])
+# Counts are unknown until the export is closed, so the header reserves fixed-width fields for them
+_PLY_COUNT_WIDTH = 12
+
+
+class BaseStreamExporter(abc.ABC):
+    """
+    Writes meshes to a file one by one, so only the mesh being written has to be kept in memory.
+    """
+    _file_path: str
+    _file: BinaryIO
+
+    def __init__(self, file_path: str):
+        self._file_path = file_path
+        self._file = open(file_path, 'wb')
+
+    @abc.abstractmethod
+    def add(self, mesh: trimesh.Trimesh) -> None:
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "BaseStreamExporter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+class StlStreamExporter(BaseStreamExporter):
+    _triangles_count: int
+
+    def __init__(self, file_path: str):
+        super().__init__(file_path)
+        self._triangles_count = 0
+        self._file.write(b'\0' * 80)
+        self._file.write(np.array([0], dtype='<u4').tobytes())
+
+    def add(self, mesh: trimesh.Trimesh) -> None:
+        triangles = np.zeros(len(mesh.faces), dtype=_STL_TRIANGLE_DTYPE)
+        triangles['normal'] = mesh.face_normals
+        triangles['vertices'] = mesh.triangles
+        self._file.write(triangles.tobytes())
+        self._triangles_count += len(triangles)
+
+    def close(self) -> None:
+        self._file.seek(80)
+        self._file.write(np.array([self._triangles_count], dtype='<u4').tobytes())
+        super().close()
+
+
+class ObjStreamExporter(BaseStreamExporter):
+    _vertices_count: int
+
+    def __init__(self, file_path: str):
+        super().__init__(file_path)
+        self._vertices_count = 0
+
+    def add(self, mesh: trimesh.Trimesh) -> None:
+        np.savetxt(self._file, mesh.vertices, fmt='v %.8g %.8g %.8g')
+        np.savetxt(self._file, mesh.faces + self._vertices_count + 1, fmt='f %d %d %d')
+        self._vertices_count += len(mesh.vertices)
+
+
+class PlyStreamExporter(BaseStreamExporter):
+    """
+    Binary PLY with per-face colors. Faces are spooled to a temporary file and appended after
+    all vertices on close, as PLY stores every vertex before the first face.
+    """
+    _faces_file: BinaryIO
+    _vertices_count: int
+    _faces_count: int
+
+    def __init__(self, file_path: str):
+        super().__init__(file_path)
+        self._faces_file = tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(file_path)))
+        self._vertices_count = 0
+        self._faces_count = 0
+        self._file.write(self._create_header().encode('ascii'))
+
+    def add(self, mesh: trimesh.Trimesh) -> None:
+        vertices = np.zeros(len(mesh.vertices), dtype=_PLY_VERTEX_DTYPE)
+        vertices['x'], vertices['y'], vertices['z'] = mesh.vertices.T
+
+        face_colors = mesh.visual.face_colors
+        faces = np.zeros(len(mesh.faces), dtype=_PLY_FACE_DTYPE)
+        faces['count'] = 3
+        faces['vertex_indices'] = mesh.faces + self._vertices_count
+        faces['red'], faces['green'], faces['blue'], faces['alpha'] = face_colors.T
+
+        self._file.write(vertices.tobytes())
+        self._faces_file.write(faces.tobytes())
+        self._vertices_count += len(vertices)
+        self._faces_count += len(faces)
+
+    def close(self) -> None:
+        self._faces_file.seek(0)
+        shutil.copyfileobj(self._faces_file, self._file)
+        self._faces_file.close()
+
+        self._file.seek(0)
+        self._file.write(self._create_header().encode('ascii'))
+        super().close()
+
+    def _create_header(self) -> str:
+        return '\n'.join([
+            'ply',
+            'format binary_little_endian 1.0',
+            f'element vertex {self._vertices_count:0{_PLY_COUNT_WIDTH}d}',
+            'property float x',
+            'property float y',
+            'property float z',
+            f'element face {self._faces_count:0{_PLY_COUNT_WIDTH}d}',
+            'property list uchar int vertex_indices',
+            'property uchar red',
+            'property uchar green',
+            'property uchar blue',
+            'property uchar alpha',
+            'end_header',
+        ]) + '\n'
+
+
+def create_stream_exporter(file_path: str) -> BaseStreamExporter:
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == '.stl':
+        return StlStreamExporter(file_path)
+    if extension == '.obj':
+        return ObjStreamExporter(file_path)
+    if extension == '.ply':
+        return PlyStreamExporter(file_path)
+    raise ValueError(f"Unsupported stream export format: {extension}")
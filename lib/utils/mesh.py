@@ -1,51 +1,83 @@
 import math
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Tuple, Sequence, List, Optional
 
+import numpy as np
 import pyvista as pv
+import shapely
 import trimesh
-from trimeshtools.combine import union_meshes
 from trimeshtools.move import move_to_bound
 from trimeshtools.rotate import create_rotation_matrix_for_x, create_rotation_matrix_for_z
 
 from lib.constants import CYLINDER_SECTIONS
+from lib.utils.boolean import boolean_union
+from lib.utils.primitives import get_primitive, create_cylinder, create_icosphere, create_torus
 
 
 def create_bounded_pipe_mesh(pipe_radius: float, bond_radius: float, horizontal_length: float, vertical_length: float) -> trimesh.Trimesh:
-    vertical_cylinder = trimesh.creation.cylinder(radius=pipe_radius, height=vertical_length - bond_radius, sections=CYLINDER_SECTIONS)
-    horizontal_cylinder = trimesh.creation.cylinder(radius=pipe_radius, height=horizontal_length - bond_radius, sections=CYLINDER_SECTIONS)
+    vertical_cylinder = create_cylinder(pipe_radius, vertical_length - bond_radius, CYLINDER_SECTIONS)
+    horizontal_cylinder = create_cylinder(pipe_radius, horizontal_length - bond_radius, CYLINDER_SECTIONS)
     horizontal_cylinder.apply_transform(create_rotation_matrix_for_x(math.pi / 2))
     horizontal_cylinder.apply_transform(create_rotation_matrix_for_z(math.pi / 2))
 
-    torus = trimesh.creation.torus(major_radius=bond_radius, minor_radius=pipe_radius, major_sections=CYLINDER_SECTIONS, minor_sections=CYLINDER_SECTIONS)
-    torus.apply_transform(create_rotation_matrix_for_x(math.pi / 2))
-    diff_box = trimesh.creation.box([(bond_radius + pipe_radius) * 2, (bond_radius + pipe_radius) * 2, (bond_radius + pipe_radius) * 2])
-    torus = torus.difference(move_to_bound(diff_box, 1, 0, 0))
-    torus = torus.difference(move_to_bound(diff_box, 0, 0, -1))
+    torus = create_quarter_torus(bond_radius, pipe_radius, CYLINDER_SECTIONS)
 
     move_to_bound(torus, 1, 0, 1)
     move_to_bound(vertical_cylinder, 1, 0, -1)
-    final_mesh = union_meshes(vertical_cylinder, torus)
+    final_mesh = boolean_union(vertical_cylinder, torus)
 
     move_to_bound(final_mesh, -1, 0, -1)
     move_to_bound(horizontal_cylinder, 1, 0, -1)
-    final_mesh = union_meshes(horizontal_cylinder, final_mesh)
+    final_mesh = boolean_union(horizontal_cylinder, final_mesh)
 
     final_mesh.apply_translation([0, 0, pipe_radius])
 
     return final_mesh
 
 
+def clip_mesh(mesh: trimesh.Trimesh, origin: Sequence[float], normal: Sequence[float]) -> trimesh.Trimesh:
+    """
+    Keeps the part of the mesh on the side of the plane the normal points to and closes the cut with a cap.
+
+    Same result as the difference with an oversized box covering the other half-space, without the CSG engine.
+    """
+    return mesh.slice_plane(origin, normal, cap=True)
+
+
+def create_half_sphere(radius: float, subdivisions: int = 3) -> trimesh.Trimesh:
+    # Верхняя половина icosphere (z >= 0) с центром в начале координат
+    return get_primitive('half_sphere', (float(radius), subdivisions), lambda: clip_mesh(
+        create_icosphere(radius, subdivisions), [0, 0, 0], [0, 0, 1],
+    ))
+
+
+def create_quarter_torus(major_radius: float, minor_radius: float, sections: int) -> trimesh.Trimesh:
+    # Четверть тора в плоскости XZ (x <= 0, z >= 0) с центром в начале координат
+    return get_primitive('quarter_torus', (float(major_radius), float(minor_radius), sections), lambda: _create_quarter_torus(
+        major_radius, minor_radius, sections,
+    ))
+
+
+def _create_quarter_torus(major_radius: float, minor_radius: float, sections: int) -> trimesh.Trimesh:
+    torus = create_torus(major_radius, minor_radius, sections, sections)
+    torus.apply_transform(create_rotation_matrix_for_x(math.pi / 2))
+    torus = clip_mesh(torus, [0, 0, 0], [-1, 0, 0])
+    return clip_mesh(torus, [0, 0, 0], [0, 0, 1])
+
+
 def create_pin_mesh(thickness: float, horizontal_length: float, top_vertical_length: float, bottom_vertical_length: float, top_width: float, bottom_width: float) -> trimesh.Trimesh:
     top_horizontal_mesh = trimesh.creation.box([horizontal_length, top_width, thickness])
     top_vertical_mesh = trimesh.creation.box([thickness, top_width, top_vertical_length])
     move_to_bound(top_horizontal_mesh, -1, 0, -1)
     move_to_bound(top_vertical_mesh, 1, 0, -1)
-    top_mesh = union_meshes(top_vertical_mesh, top_horizontal_mesh)
+    top_mesh = boolean_union(top_vertical_mesh, top_horizontal_mesh)
 
     bottom_mesh = trimesh.creation.box([thickness, bottom_width, bottom_vertical_length])
     move_to_bound(top_mesh, -1, 0, 1)
     move_to_bound(bottom_mesh, -1, 0, -1)
 
-    final_mesh = union_meshes(top_mesh, bottom_mesh)
+    final_mesh = boolean_union(top_mesh, bottom_mesh)
     return final_mesh
 
 
@@ -61,4 +93,117 @@ def create_text_mesh(text: str, height: float, scale: float = 1.0) -> trimesh.Tr
     # Создаем trimesh объект
     mesh = trimesh.Trimesh(vertices=vertices, faces=faces)
 
-    return mesh
\ No newline at end of file
+    return mesh
+
+
+def tile_triangulation(vertices: np.ndarray, faces: np.ndarray, offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Повторяем одну триангуляцию во всех точках offsets за одну векторную операцию
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    offsets = np.asarray(offsets, dtype=np.float64)
+
+    tiled_vertices = (vertices[np.newaxis, :, :] + offsets[:, np.newaxis, :]).reshape(-1, vertices.shape[1])
+    faces_offsets = np.arange(len(offsets), dtype=np.int64) * len(vertices)
+    tiled_faces = (faces[np.newaxis, :, :] + faces_offsets[:, np.newaxis, np.newaxis]).reshape(-1, 3)
+
+    return tiled_vertices, tiled_faces
+
+
+def orient_faces_ccw(vertices: np.ndarray, faces: np.ndarray) -> np.ndarray:
+    # Разворачиваем треугольники плоской триангуляции так, чтобы все обходились против часовой стрелки в XY
+    triangles = vertices[faces]
+    areas = np.cross(triangles[:, 1, :2] - triangles[:, 0, :2], triangles[:, 2, :2] - triangles[:, 0, :2])
+    return np.where((areas < 0)[:, np.newaxis], faces[:, ::-1], faces)
+
+
+def tile_mesh(mesh: trimesh.Trimesh, offsets: np.ndarray) -> trimesh.Trimesh:
+    vertices, faces = tile_triangulation(mesh.vertices, mesh.faces, offsets)
+    return trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+
+
+def extrude_geometry(geometry: shapely.Geometry, height: float) -> trimesh.Trimesh:
+    # Убираем вырожденные и коллинеарные точки, иначе триангуляция может оставить щели
+    geometry = shapely.simplify(geometry, 1e-6)
+
+    # Экструдируем каждый полигон отдельно, после unary_union они не пересекаются
+    polygons = [polygon for polygon in shapely.get_parts(geometry) if isinstance(polygon, shapely.Polygon) and not polygon.is_empty]
+    if len(polygons) == 0:
+        return trimesh.Trimesh()
+
+    return trimesh.util.concatenate([trimesh.creation.extrude_polygon(polygon, height) for polygon in polygons])
+
+
+def get_overlapping_pairs(bounds: np.ndarray) -> np.ndarray:
+    # Пары индексов (i, j), i < j, чьи AABB пересекаются или касаются; bounds имеет форму (n, 2, 3)
+    order = np.argsort(bounds[:, 0, 0], kind='stable')
+    sorted_bounds = bounds[order]
+
+    # Развертка по оси X: кандидаты для i - только следующие за ним боксы, начинающиеся до его конца
+    ends = np.searchsorted(sorted_bounds[:, 0, 0], sorted_bounds[:, 1, 0], side='right')
+
+    pairs = []
+    for i in range(len(sorted_bounds)):
+        candidates = np.arange(i + 1, ends[i])
+        if len(candidates) == 0:
+            continue
+        overlap = np.all(
+            (sorted_bounds[candidates, 0, 1:] <= sorted_bounds[i, 1, 1:]) &
+            (sorted_bounds[candidates, 1, 1:] >= sorted_bounds[i, 0, 1:]),
+            axis=1,
+        )
+        for j in candidates[overlap]:
+            pairs.append(sorted((order[i], order[j])))
+
+    return np.array(pairs, dtype=np.int64).reshape(-1, 2)
+
+
+def get_overlapping_groups(meshes: Sequence[trimesh.Trimesh]) -> List[List[int]]:
+    # Компоненты связности графа пересечений AABB, порядок мешей внутри группы сохраняется
+    bounds = np.array([mesh.bounds for mesh in meshes], dtype=np.float64).reshape(-1, 2, 3)
+    components = trimesh.graph.connected_components(get_overlapping_pairs(bounds), nodes=np.arange(len(meshes)), min_len=1)
+    return sorted(sorted(int(i) for i in component) for component in components)
+
+
+def union_tree(meshes: Sequence[trimesh.Trimesh], max_workers: Optional[int] = None) -> trimesh.Trimesh:
+    # Объединяем попарно по уровням сбалансированного дерева: глубина log2(n) вместо n
+    assert len(meshes) > 0
+    if len(meshes) == 1:
+        return meshes[0].copy()
+    meshes = list(meshes)
+
+    with ThreadPoolExecutor(max_workers=max_workers) if max_workers != 1 else nullcontext() as executor:
+        while len(meshes) > 1:
+            pairs = [(meshes[i], meshes[i + 1]) for i in range(0, len(meshes) - 1, 2)]
+            unpaired = meshes[-1:] if len(meshes) % 2 == 1 else []
+
+            if executor is None or len(pairs) == 1:
+                meshes = [boolean_union(a, b) for a, b in pairs] + unpaired
+            else:
+                meshes = list(executor.map(lambda pair: boolean_union(*pair), pairs)) + unpaired
+
+    return meshes[0]
+
+
+def union_components(meshes: Sequence[trimesh.Trimesh], max_workers: Optional[int] = 1) -> trimesh.Trimesh:
+    """
+    Boolean union of many meshes.
+
+    Meshes whose bounding boxes don't touch can't intersect, so they are joined by plain concatenation.
+    Only groups of overlapping meshes are united, each by a balanced tree of unions;
+    with max_workers other than 1 the unions of a tree level run in a thread pool.
+    The result is always a new mesh, never one of the inputs.
+    """
+    assert len(meshes) > 0
+    if len(meshes) == 1:
+        return meshes[0].copy()
+
+    results = []
+    for group in get_overlapping_groups(meshes):
+        if len(group) == 1:
+            results.append(meshes[group[0]])
+        else:
+            results.append(union_tree([meshes[i] for i in group], max_workers))
+
+    if len(results) == 1:
+        return results[0]
+    return trimesh.util.concatenate(results)
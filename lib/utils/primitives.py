@@ -0,0 +1,51 @@
+from typing import Callable, Optional, Tuple
+
+import trimesh
+
+from lib.constants import PRIMITIVE_CACHE_MAX_BYTES
+from lib.utils.cache import MeshCache
+
+# Один кэш на процесс: примитивы с одинаковыми параметрами строятся всеми билдерами повторно
+PRIMITIVE_CACHE = MeshCache(PRIMITIVE_CACHE_MAX_BYTES)
+
+
+def get_primitive(kind: str, params: Tuple, create: Callable[[], trimesh.Trimesh]) -> trimesh.Trimesh:
+    """
+    Returns a copy of the mesh created by create() for the (kind, params) key, creating it only once.
+
+    The cached mesh keeps its computed normals, the copy shares nothing with it and can be transformed freely.
+    """
+    key = f'{kind}:{params!r}'
+    mesh = PRIMITIVE_CACHE.get(key)
+
+    if mesh is None:
+        mesh = create()
+        # Нормали считаем заранее, чтобы они попали в кэш и копировались вместе с мешем
+        _ = mesh.face_normals, mesh.vertex_normals
+        PRIMITIVE_CACHE.put(key, mesh)
+
+    return mesh.copy(include_cache=True)
+
+
+def create_cylinder(radius: float, height: float, sections: Optional[int] = None) -> trimesh.Trimesh:
+    return get_primitive(
+        'cylinder',
+        (float(radius), float(height), sections),
+        lambda: trimesh.creation.cylinder(radius=radius, height=height, sections=sections),
+    )
+
+
+def create_icosphere(radius: float, subdivisions: int = 3) -> trimesh.Trimesh:
+    return get_primitive(
+        'icosphere',
+        (float(radius), subdivisions),
+        lambda: trimesh.creation.icosphere(subdivisions=subdivisions, radius=radius),
+    )
+
+
+def create_torus(major_radius: float, minor_radius: float, major_sections: int = 32, minor_sections: int = 32) -> trimesh.Trimesh:
+    return get_primitive(
+        'torus',
+        (float(major_radius), float(minor_radius), major_sections, minor_sections),
+        lambda: trimesh.creation.torus(major_radius=major_radius, minor_radius=minor_radius, major_sections=major_sections, minor_sections=minor_sections),
+    )
@@ -0,0 +1,65 @@
+import os
+from typing import Tuple
+
+import numpy as np
+import trimesh
+
+MESH_FILE_EXTENSION = 'mesh'
+
+# Header: magic (8 bytes), vertices count (uint64), faces count (uint64), reserved (8 bytes).
+# It is followed by raw float64 vertices (n, 3), int64 faces (m, 3) and uint8 face colors (m, 4).
+_MAGIC = b'PCBMESH1'
+_HEADER_SIZE = 32
+
+
+def save_mesh(mesh: trimesh.Trimesh, file_path: str) -> None:
+    vertices = np.ascontiguousarray(mesh.vertices, dtype=np.float64)
+    faces = np.ascontiguousarray(mesh.faces, dtype=np.int64)
+    face_colors = np.ascontiguousarray(mesh.visual.face_colors, dtype=np.uint8)
+
+    header = np.zeros(_HEADER_SIZE, dtype=np.uint8)
+    header[:8] = np.frombuffer(_MAGIC, dtype=np.uint8)
+    header[8:24] = np.array([len(vertices), len(faces)], dtype='<u8').view(np.uint8)
+
+    # Write to a temporary file first so that a concurrent reader never sees a partial mesh
+    tmp_file_path = f'{file_path}.{os.getpid()}.tmp'
+    with open(tmp_file_path, 'wb') as file:
+        for array in (header, vertices, faces, face_colors):
+            file.write(array.tobytes())
+    os.replace(tmp_file_path, file_path)
+
+
+def load_mesh(file_path: str, mmap: bool = False) -> trimesh.Trimesh:
+    """
+    Loads a mesh saved by save_mesh().
+
+    With mmap=True vertex, face and color buffers are read-only views into a memory-mapped file:
+    pages are loaded lazily and shared between all processes reading the same file.
+    """
+    if mmap:
+        buffer = np.memmap(file_path, dtype=np.uint8, mode='r')
+    else:
+        with open(file_path, 'rb') as file:
+            buffer = np.frombuffer(bytearray(file.read()), dtype=np.uint8)
+
+    vertices_count, faces_count = _read_header(buffer[:_HEADER_SIZE], file_path)
+
+    vertices_end = _HEADER_SIZE + vertices_count*3*8
+    faces_end = vertices_end + faces_count*3*8
+    colors_end = faces_end + faces_count*4
+    if colors_end != len(buffer):
+        raise ValueError(f"Invalid mesh file: {file_path}")
+
+    vertices = buffer[_HEADER_SIZE:vertices_end].view(np.float64).reshape(-1, 3)
+    faces = buffer[vertices_end:faces_end].view(np.int64).reshape(-1, 3)
+    face_colors = buffer[faces_end:colors_end].reshape(-1, 4)
+
+    return trimesh.Trimesh(vertices=vertices, faces=faces, face_colors=face_colors, process=False)
+
+
+def _read_header(header: np.ndarray, file_path: str) -> Tuple[int, int]:
+    if len(header) < _HEADER_SIZE or header[:8].tobytes() != _MAGIC:
+        raise ValueError(f"Invalid mesh file: {file_path}")
+
+    vertices_count, faces_count = np.frombuffer(header[8:24].tobytes(), dtype='<u8')
+    return int(vertices_count), int(faces_count)
@@ -3,11 +3,16 @@ from trimeshtools.move import move_to_bound
 from trimeshtools.show import show_mesh
 
 from app.box import create_middle_box_mesh
-from app.elements import create_or_mesh, create_or_board_pattern
+from app.elements import create_or_mesh, create_or_board_pattern, create_or_scene, iter_or_meshes
 from app.test import create_test
 from lib.constants import BOARD_PAD_RADIUS, BOARD_CONTACT_PAD_RADIUS, TRACK_WIDTH, BOARD_GRID_STEP
-from lib.pattern.builders import BoardPatternImageBuilder, BoardPatternMeshBuilder, ReliefBoardPatternMeshBuilder
+from lib.pattern.builders import BoardPatternImageBuilder, BoardPatternMeshBuilder, ReliefBoardPatternMeshBuilder, \
+    TiledBoardPatternImageBuilder, SdfBoardPatternImageBuilder, ExtrudedBoardPatternMeshBuilder, \
+    ExtrudedReliefBoardPatternMeshBuilder, IncrementalReliefBoardPatternMeshBuilder
+from lib.pattern.normalize import normalize_board_pattern
+from lib.pattern.vector import BoardPatternSvgBuilder, BoardPatternGerberBuilder
 from lib.pattern.structs import BoardPattern, Pin, Track, MultiTrack
+from lib.utils.export import create_stream_exporter
 
 
 def run_build_mesh():
@@ -31,6 +36,29 @@ def run_build_mesh():
     show_mesh(final_mesh, with_axis=False)
 
 
+def run_build_scene():
+    file_name = 'test'
+
+    # Every unique part is stored once, placements are glTF node instances
+    scene = create_or_scene()
+
+    scene.export(f'output/{file_name}.glb')
+    print(f'Saved: output/{file_name}.glb')
+
+
+def run_build_mesh_stream():
+    file_name = 'test'
+
+    # Same assembly as run_build_mesh(), but each part is written as soon as it is produced,
+    # so the whole assembly is never held in memory
+    with create_stream_exporter(f'output/{file_name}.stl') as exporter:
+        for mesh in iter_or_meshes():
+            exporter.add(mesh)
+        exporter.add(create_middle_box_mesh())
+
+    print(f'Saved: output/{file_name}.stl')
+
+
 def run_build_pattern():
     file_name = 'pattern'
 
@@ -54,7 +82,42 @@ def run_build_pattern():
     image.save("output/pattern.png", dpi=(300, 300))
     image.show()
 
+    BoardPatternSvgBuilder(step=BOARD_GRID_STEP, board_pattern=board_pattern, draw_grid=False).save("output/pattern.svg")
+    BoardPatternGerberBuilder(step=BOARD_GRID_STEP, board_pattern=board_pattern).save("output/pattern.gbr")
+
+
+def run_check_pattern():
+    # Every pattern builder has to accept a normalized pattern and build the same solid from it
+    board_pattern = create_or_board_pattern()
+    normalized_pattern = normalize_board_pattern(board_pattern, BOARD_GRID_STEP)
+
+    for builder_class in [
+        BoardPatternMeshBuilder,
+        ReliefBoardPatternMeshBuilder,
+        ExtrudedBoardPatternMeshBuilder,
+        ExtrudedReliefBoardPatternMeshBuilder,
+        IncrementalReliefBoardPatternMeshBuilder,
+    ]:
+        mesh = builder_class(step=BOARD_GRID_STEP, board_pattern=board_pattern).build()
+        normalized_mesh = builder_class(step=BOARD_GRID_STEP, board_pattern=normalized_pattern).build()
+        assert normalized_mesh.is_watertight, builder_class.__name__
+        assert abs(normalized_mesh.volume - mesh.volume) < 1e-3, builder_class.__name__
+        print(f'{builder_class.__name__}: ok')
+
+    for builder_class in [
+        BoardPatternImageBuilder,
+        TiledBoardPatternImageBuilder,
+        SdfBoardPatternImageBuilder,
+        BoardPatternSvgBuilder,
+        BoardPatternGerberBuilder,
+    ]:
+        builder_class(step=BOARD_GRID_STEP, board_pattern=normalized_pattern).build()
+        print(f'{builder_class.__name__}: ok')
+
 
 if __name__ == '__main__':
     # run_build_mesh()
+    # run_build_scene()
+    # run_build_mesh_stream()
+    # run_check_pattern()
     run_build_pattern()